@@ -3,6 +3,7 @@ import random
 import copy
 from tabulate import tabulate
 import datetime
+import os
 
 # Структури даних
 class Auditorium:
@@ -23,7 +24,7 @@ class Lecturer:
         self.subjects_can_teach = [s.strip() for s in subjects_can_teach.split(';')] if subjects_can_teach else []
         self.types_can_teach = [t.strip() for t in types_can_teach.split(';')] if types_can_teach else []
         self.max_hours_per_week = int(max_hours_per_week)
-        self.assigned_hours = 0  # Для відстеження навантаження
+        self.index = None  # Позиція у lecturers, індекс у Schedule.lecturer_load
 
 class Subject:
     def __init__(self, subject_id, name, group_id, num_lectures, num_practicals, requires_subgroups, week_type):
@@ -127,31 +128,40 @@ def read_subjects(filename):
         print(f"Помилка при читанні {filename}: {e}")
     return subjects
 
-# Завантаження даних
-auditoriums = read_auditoriums('auditoriums.csv')
-groups = read_groups('groups.csv')
-lecturers = read_lecturers('lecturers.csv')  # Змінено ім'я файлу на 'lecturers.csv'
-subjects = read_subjects('subjects.csv')
-
-# Перевірка відповідності groupID у subjects.csv з groups.csv
-valid_group_ids = set(group.number for group in groups)
-filtered_subjects = []
-for subject in subjects:
-    if subject.group_id in valid_group_ids:
-        filtered_subjects.append(subject)
-    else:
-        print(f"Warning: Group {subject.group_id} not found for subject {subject.name}")
-subjects = filtered_subjects
+# Завантаження даних (викликається явно, імпорт модуля нічого не читає)
+auditoriums = []
+groups = []
+lecturers = []
+subjects = []
+
+def load_data(directory='.'):
+    global auditoriums, groups, lecturers, subjects
+    auditoriums = read_auditoriums(os.path.join(directory, 'auditoriums.csv'))
+    groups = read_groups(os.path.join(directory, 'groups.csv'))
+    lecturers = read_lecturers(os.path.join(directory, 'lecturers.csv'))  # Змінено ім'я файлу на 'lecturers.csv'
+    subjects = read_subjects(os.path.join(directory, 'subjects.csv'))
+    for index, lecturer in enumerate(lecturers):
+        lecturer.index = index
+
+    # Перевірка відповідності groupID у subjects.csv з groups.csv
+    valid_group_ids = set(group.number for group in groups)
+    filtered_subjects = []
+    for subject in subjects:
+        if subject.group_id in valid_group_ids:
+            filtered_subjects.append(subject)
+        else:
+            print(f"Warning: Group {subject.group_id} not found for subject {subject.name}")
+    subjects = filtered_subjects
 
-# Перевірка, що кожен subject має принаймні одного викладача
-subject_ids = set(subject.id for subject in subjects)
-lecturer_subjects = set()
-for lecturer in lecturers:
-    lecturer_subjects.update(lecturer.subjects_can_teach)
+    # Перевірка, що кожен subject має принаймні одного викладача
+    subject_ids = set(subject.id for subject in subjects)
+    lecturer_subjects = set()
+    for lecturer in lecturers:
+        lecturer_subjects.update(lecturer.subjects_can_teach)
 
-missing_subjects = subject_ids - lecturer_subjects
-if missing_subjects:
-    print(f"Warning: Для наступних предметів немає викладачів: {', '.join(missing_subjects)}")
+    missing_subjects = subject_ids - lecturer_subjects
+    if missing_subjects:
+        print(f"Warning: Для наступних предметів немає викладачів: {', '.join(missing_subjects)}")
 
 # Визначення часів: 5 днів, 4 періоди на день
 DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
@@ -172,6 +182,9 @@ class Schedule:
     def __init__(self):
         # Ключ: time_slot (day, period), Значення: список занять у цей час
         self.timetable = {time_slot: [] for time_slot in TIME_SLOTS}
+        # Навантаження викладачів саме цього розкладу (за lecturer.index): розклади не мають
+        # спільного змінного стану, тож їх можна будувати незалежно, зокрема в різних процесах
+        self.lecturer_load = [0] * len(lecturers)
         self.fitness = None  # Буде розраховано
 
     def calculate_fitness(self):
@@ -241,12 +254,13 @@ class Schedule:
 
         self.fitness = 1 / (1 + penalty)
 
-def get_possible_lecturers(lesson):
-    # Співставляємо викладачів за subject.id та типом заняття (жорстке обмеження)
+def get_possible_lecturers(lesson, schedule):
+    # Співставляємо викладачів за subject.id та типом заняття (жорстке обмеження),
+    # з вільними годинами в цьому розкладі
     possible = [lecturer for lecturer in lecturers if
                lesson.subject.id in lecturer.subjects_can_teach and
                lesson.type in lecturer.types_can_teach and
-               lecturer.assigned_hours < lecturer.max_hours_per_week]
+               schedule.lecturer_load[lecturer.index] < lecturer.max_hours_per_week]
     if not possible:
         print(f"No lecturer available for {lesson.subject.name} ({lesson.type}) with subject ID {lesson.subject.id}")
     return possible
@@ -294,27 +308,27 @@ def create_initial_population():
             lectures_total = subject.num_lectures  # Загальна кількість лекцій за семестр
             for _ in range(lectures_total):
                 lesson = Lesson(subject, 'Лекція', group)
-                possible_lecturers = get_possible_lecturers(lesson)
+                possible_lecturers = get_possible_lecturers(lesson, schedule)
                 if not possible_lecturers:
                     print(f"Cannot assign lecture for {subject.name} to group {group.number}: No available lecturers.")
                     continue  # Не може бути призначено
                 lecturer = random.choice(possible_lecturers)
                 lesson.lecturer = lecturer
-                lecturer.assigned_hours += 1  # Збільшуємо навантаження
+                schedule.lecturer_load[lecturer.index] += 1  # Збільшуємо навантаження
                 # Фільтрація аудиторій за місткістю
                 suitable_auditoriums = [aud for aud in auditoriums if aud.capacity >= group.size]
                 if not suitable_auditoriums:
                     print(f"No auditorium available for {lesson.subject.name} for group {group.number}")
-                    # Відновлення assigned_hours, оскільки аудиторію не призначено
-                    lecturer.assigned_hours -= 1
+                    # Відновлення навантаження, оскільки аудиторію не призначено
+                    schedule.lecturer_load[lecturer.index] -= 1
                     continue
                 auditorium = random.choice(suitable_auditoriums)
                 lesson.auditorium = auditorium
                 # Призначення рандомного часового слоту без порушення жорстких обмежень
                 assigned = assign_randomly(lesson, schedule)
                 if not assigned:
-                    # Відновлення assigned_hours, оскільки часового слота не призначено
-                    lecturer.assigned_hours -= 1
+                    # Відновлення навантаження, оскільки часового слота не призначено
+                    schedule.lecturer_load[lecturer.index] -= 1
                     print(f"Failed to assign lecture for {lesson.subject.name} to group {group.number}")
             # Практичні
             pract_total = subject.num_practicals  # Загальна кількість практичних за семестр
@@ -324,53 +338,53 @@ def create_initial_population():
                     num_practicals_per_subgroup = pract_total // len(group.subgroups)
                     for _ in range(num_practicals_per_subgroup):
                         lesson = Lesson(subject, 'Практика', group, subgroup)
-                        possible_lecturers = get_possible_lecturers(lesson)
+                        possible_lecturers = get_possible_lecturers(lesson, schedule)
                         if not possible_lecturers:
                             print(f"Cannot assign practical for {subject.name} to subgroup {subgroup} of group {group.number}: No available lecturers.")
                             continue  # Не може бути призначено
                         lecturer = random.choice(possible_lecturers)
                         lesson.lecturer = lecturer
-                        lecturer.assigned_hours += 1  # Збільшуємо навантаження
+                        schedule.lecturer_load[lecturer.index] += 1  # Збільшуємо навантаження
                         # Розрахунок кількості студентів у підгрупі
                         subgroup_size = group.size // len(group.subgroups)
                         suitable_auditoriums = [aud for aud in auditoriums if aud.capacity >= subgroup_size]
                         if not suitable_auditoriums:
                             print(f"No auditorium available for {lesson.subject.name} for subgroup {subgroup} of group {group.number}")
-                            # Відновлення assigned_hours, оскільки аудиторію не призначено
-                            lecturer.assigned_hours -= 1
+                            # Відновлення навантаження, оскільки аудиторію не призначено
+                            schedule.lecturer_load[lecturer.index] -= 1
                             continue
                         auditorium = random.choice(suitable_auditoriums)
                         lesson.auditorium = auditorium
                         # Призначення рандомного часового слоту без порушення жорстких обмежень
                         assigned = assign_randomly(lesson, schedule)
                         if not assigned:
-                            # Відновлення assigned_hours, оскільки часового слота не призначено
-                            lecturer.assigned_hours -= 1
+                            # Відновлення навантаження, оскільки часового слота не призначено
+                            schedule.lecturer_load[lecturer.index] -= 1
                             print(f"Failed to assign practical for {lesson.subject.name} to subgroup {subgroup} of group {group.number}")
             else:
                 for _ in range(pract_total):
                     lesson = Lesson(subject, 'Практика', group)
-                    possible_lecturers = get_possible_lecturers(lesson)
+                    possible_lecturers = get_possible_lecturers(lesson, schedule)
                     if not possible_lecturers:
                         print(f"Cannot assign practical for {subject.name} to group {group.number}: No available lecturers.")
                         continue  # Не може бути призначено
                     lecturer = random.choice(possible_lecturers)
                     lesson.lecturer = lecturer
-                    lecturer.assigned_hours += 1  # Збільшуємо навантаження
+                    schedule.lecturer_load[lecturer.index] += 1  # Збільшуємо навантаження
                     # Фільтрація аудиторій за місткістю
                     suitable_auditoriums = [aud for aud in auditoriums if aud.capacity >= group.size]
                     if not suitable_auditoriums:
                         print(f"No auditorium available for {lesson.subject.name} for group {group.number}")
-                        # Відновлення assigned_hours, оскільки аудиторію не призначено
-                        lecturer.assigned_hours -= 1
+                        # Відновлення навантаження, оскільки аудиторію не призначено
+                        schedule.lecturer_load[lecturer.index] -= 1
                         continue
                     auditorium = random.choice(suitable_auditoriums)
                     lesson.auditorium = auditorium
                     # Призначення рандомного часового слоту без порушення жорстких обмежень
                     assigned = assign_randomly(lesson, schedule)
                     if not assigned:
-                        # Відновлення assigned_hours, оскільки часового слота не призначено
-                        lecturer.assigned_hours -= 1
+                        # Відновлення навантаження, оскільки часового слота не призначено
+                        schedule.lecturer_load[lecturer.index] -= 1
                         print(f"Failed to assign practical for {lesson.subject.name} to group {group.number}")
         # Обчислення фітнесу
         schedule.calculate_fitness()
@@ -426,11 +440,13 @@ def crossover(parent1, parent2):
                     # Глибоке копіювання заняття
                     copied_lesson = copy.deepcopy(lesson)
                     child.timetable[time_slot].append(copied_lesson)
+                    child.lecturer_load[lesson.lecturer.index] += 1
         else:
             for lesson in parent2.timetable[time_slot]:
                 if not is_conflict(lesson, time_slot, child):
                     copied_lesson = copy.deepcopy(lesson)
                     child.timetable[time_slot].append(copied_lesson)
+                    child.lecturer_load[lesson.lecturer.index] += 1
     # Розрахунок фітнесу після кросоверу
     child.calculate_fitness()
     return child
@@ -566,8 +582,11 @@ def print_schedule(schedule):
     else:
         print("No lessons scheduled for ODD week.\n")
 
-# Запуск генетичного алгоритму та отримання найкращого розкладу
-best_schedule = genetic_algorithm()
+if __name__ == "__main__":
+    load_data()
+
+    # Запуск генетичного алгоритму та отримання найкращого розкладу
+    best_schedule = genetic_algorithm()
 
-# Вивід фінального розкладу у консоль
-print_schedule(best_schedule)
+    # Вивід фінального розкладу у консоль
+    print_schedule(best_schedule)
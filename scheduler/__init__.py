@@ -0,0 +1,13 @@
+# Genetic-algorithm university timetable generator.
+#
+#   problem = load_problem('data/')  # directory with the four input CSV files
+#   result = solve(problem, Config(generations=200, seed=1))
+#   result.schedule, result.fitness
+#
+# Nothing is read or computed at import time.
+
+from .ga import Config, Result, solve
+from .problem import Problem, load_problem
+from .schedule import Schedule
+
+__all__ = ['Config', 'Problem', 'Result', 'Schedule', 'load_problem', 'solve']
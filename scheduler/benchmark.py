@@ -0,0 +1,236 @@
+# Scaling benchmarks on synthetic faculties (see synthetic.py).
+#
+#   python -m scheduler.benchmark --scales 10 100 1000 --output benchmark.json
+#
+# For every scale the instance is generated, written as CSV and loaded like real input, then
+# every phase is timed on its own: building the initial population, crossover, mutation, the
+# reference calculate_fitness, batched evaluation and a short full run. Each phase runs once for
+# the wall time and once more under tracemalloc for the peak memory, so tracing does not distort
+# the timings. With --memetic the plain GA and the GA with the memetic step (local_search.py)
+# are also timed until they reach the final fitness of the full run. With --service-jobs that
+# many jobs are submitted at once to the HTTP service (service.py) on the smallest scale, once
+# for every number of job slots, for the throughput under concurrent jobs. The JSON report can
+# be diffed between commits to catch regressions.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .ga import Config, solve
+from .operators import create_initial_population, crossover, evaluate_population, mutate
+from .problem import INPUT_FILES, load_problem
+from .schedule import WEEKS
+from .synthetic import generate_instance, write_instance
+
+MAX_GENERATIONS_TO_TARGET = 3
+
+def measure(run):
+    # run() returns the number of fitness evaluations it did
+    start = time.perf_counter()
+    evaluations = run()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': seconds,
+        'evaluations': evaluations,
+        'evaluations_per_second': evaluations / seconds if seconds else None,
+        'peak_memory_bytes': peak,
+    }
+
+def time_to_target(problem, config, target_fitness, seed, memetic_individuals=0, memetic_moves=0):
+    # Runs for up to MAX_GENERATIONS_TO_TARGET times config.generations
+    run_config = Config(population_size=config.population_size, seed=seed, batch_fitness=config.batch_fitness,
+                        generations=MAX_GENERATIONS_TO_TARGET * config.generations, target_fitness=target_fitness,
+                        memetic_individuals=memetic_individuals, memetic_moves=memetic_moves)
+    start = time.perf_counter()
+    run = solve(problem, run_config)
+    return {
+        'seconds': time.perf_counter() - start,
+        'generations': run.generations,
+        'fitness': run.fitness,
+        'reached': run.stop_reason in ('target', 'optimal'),
+    }
+
+def benchmark_scale(num_groups, config, operations, seed, memetic_individuals=0, memetic_moves=0):
+    with tempfile.TemporaryDirectory() as directory:
+        write_instance(generate_instance(num_groups, seed), directory)
+        problem = load_problem(directory)
+    result = {
+        'groups': len(problem.groups),
+        'subjects': len(problem.subjects),
+        'lecturers': len(problem.lecturers),
+        'auditoriums': len(problem.auditoriums),
+        'phases': {},
+    }
+    phases = result['phases']
+
+    def build():
+        random.seed(seed)
+        create_initial_population(problem, config)
+        return config.population_size
+    phases['create_initial_population'] = measure(build)
+
+    random.seed(seed)
+    population = create_initial_population(problem, config)
+    result['lessons_per_schedule'] = sum(len(lessons) for week in WEEKS
+                                         for lessons in population[0].timetable(week).values())
+
+    def crossovers():
+        rng = random.Random(seed)
+        for _ in range(operations):
+            crossover(*rng.sample(population, 2))
+        return operations
+    phases['crossover'] = measure(crossovers)
+
+    def mutations():
+        random.seed(seed)
+        for i in range(operations):
+            mutate(population[i % len(population)].clone())
+        return operations
+    phases['mutate'] = measure(mutations)
+
+    def reference_fitness():
+        for schedule in population:
+            schedule.calculate_fitness()
+        return len(population)
+    phases['calculate_fitness'] = measure(reference_fitness)
+
+    def batch_fitness():
+        evaluate_population(population, config.batch_fitness)
+        return len(population)
+    phases['evaluate_population'] = measure(batch_fitness)
+
+    best = {}
+    def full_run():
+        run = solve(problem, Config(population_size=config.population_size, generations=config.generations,
+                                    seed=seed, batch_fitness=config.batch_fitness))
+        best['fitness'] = run.fitness
+        best['generations'] = run.generations
+        return config.population_size * (run.generations + 1)
+    phases['full_run'] = measure(full_run)
+    result['final_fitness'] = best['fitness']
+    result['generations'] = best['generations']
+    if memetic_individuals:
+        result['time_to_target'] = {
+            'target_fitness': best['fitness'],
+            'memetic_individuals': memetic_individuals,
+            'memetic_moves': memetic_moves,
+            'plain': time_to_target(problem, config, best['fitness'], seed),
+            'memetic': time_to_target(problem, config, best['fitness'], seed, memetic_individuals, memetic_moves),
+        }
+    return result
+
+def service_job(port, request):
+    # Submits a job and follows its events to the end; returns the seconds from submission to the result
+    start = time.perf_counter()
+    submit = urllib.request.Request(f'http://127.0.0.1:{port}/jobs', data=json.dumps(request).encode('utf-8'),
+                                    method='POST')
+    with urllib.request.urlopen(submit) as response:
+        job_id = json.load(response)['id']
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/jobs/{job_id}/events') as response:
+        response.read()  # The stream ends with the job
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/jobs/{job_id}/result') as response:
+        response.read()
+    return time.perf_counter() - start
+
+def service_throughput(num_groups, config, jobs, slots, seed):
+    from .service import Service
+    with tempfile.TemporaryDirectory() as directory:
+        write_instance(generate_instance(num_groups, seed), directory)
+        problem = {}
+        for kind, filename in INPUT_FILES.items():
+            with open(os.path.join(directory, filename), encoding='utf-8') as file:
+                problem[kind] = file.read()
+    requests = [{'problem': problem, 'config': {'population_size': config.population_size,
+                                                'generations': config.generations, 'seed': seed + job,
+                                                'batch_fitness': config.batch_fitness}}
+                for job in range(jobs)]
+
+    async def run(job_slots):
+        service = Service(job_slots)
+        port = await service.start('127.0.0.1', 0)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(jobs) as executor:
+                latencies = await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(
+                    executor, service_job, port, request) for request in requests))
+        finally:
+            await service.close()
+        seconds = time.perf_counter() - start
+        return {'slots': job_slots, 'seconds': seconds, 'jobs_per_second': jobs / seconds,
+                'mean_latency_seconds': sum(latencies) / jobs}
+    return {'groups': num_groups, 'jobs': jobs, 'runs': [asyncio.run(run(job_slots)) for job_slots in slots]}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(scales, config, operations=200, seed=0, log=None, memetic_individuals=0, memetic_moves=200,
+                   service_jobs=0, service_slots=(1, 2, 4)):
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'config': {'population_size': config.population_size, 'generations': config.generations,
+                   'batch_fitness': config.batch_fitness, 'operations': operations, 'seed': seed},
+        'scales': [],
+    }
+    for num_groups in scales:
+        if log:
+            log(f"Benchmarking {num_groups} groups...")
+        report['scales'].append(benchmark_scale(num_groups, config, operations, seed, memetic_individuals, memetic_moves))
+    if service_jobs:
+        if log:
+            log(f"Benchmarking the service with {service_jobs} jobs...")
+        report['service'] = service_throughput(min(scales), config, service_jobs, service_slots, seed)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='scheduler.benchmark', description="Benchmark the solver on synthetic faculties")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100, 1000], help="Numbers of groups")
+    parser.add_argument('--population-size', type=int, default=50)
+    parser.add_argument('--generations', type=int, default=10, help="Generations of the full run")
+    parser.add_argument('--operations', type=int, default=200, help="Crossovers and mutations timed per scale")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-batch-fitness', dest='batch_fitness', action='store_false')
+    parser.add_argument('--memetic', type=int, default=0, help="Also compare time to target with this many schedules improved per generation")
+    parser.add_argument('--memetic-moves', type=int, default=200)
+    parser.add_argument('--service-jobs', type=int, default=0, help="Also time this many concurrent service jobs")
+    parser.add_argument('--service-slots', type=int, nargs='+', default=[1, 2, 4], help="Job slots of the service to compare")
+    parser.add_argument('--output', help="JSON file for the report, stdout if omitted")
+    args = parser.parse_args(argv)
+    config = Config(population_size=args.population_size, generations=args.generations, batch_fitness=args.batch_fitness)
+    report = run_benchmarks(args.scales, config, args.operations, args.seed,
+                            log=lambda message: print(message, file=sys.stderr),
+                            memetic_individuals=args.memetic, memetic_moves=args.memetic_moves,
+                            service_jobs=args.service_jobs, service_slots=args.service_slots)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
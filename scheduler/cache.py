@@ -0,0 +1,48 @@
+# Bounded LRU cache of fitness values keyed by the canonical schedule signature.
+#
+# Schedule.signature is a hash of the set of assignments kept up to date by add_lesson and
+# remove_lesson, so looking a schedule up costs nothing beyond the dictionary access.
+# Identical schedules, e.g. children that inherited every slot from one parent, are scored
+# once; the cache is consulted by evaluate_population before the batched evaluation.
+
+from collections import OrderedDict
+
+# Memory of one entry: key, fitness, penalty breakdown, LRU links and the share of the hash table.
+# Measured with tracemalloc on full caches of 0.25 to 16 MB: 300 to 430 bytes on 64-bit CPython 3.11.
+ENTRY_BYTES = 512
+BREAKDOWN = ('gap', 'overload', 'subject')  # Order of the penalty totals in an entry
+
+class FitnessCache:
+    def __init__(self, max_bytes):
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.entries = OrderedDict()  # signature -> (fitness, penalty totals in BREAKDOWN order)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, schedule):
+        entry = self.entries.get(schedule.signature)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(schedule.signature)
+        self.hits += 1
+        return entry
+
+    def put(self, schedule):
+        self.entries[schedule.signature] = (schedule.fitness, tuple(schedule.penalty_by_kind[kind] for kind in BREAKDOWN))
+        self.entries.move_to_end(schedule.signature)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+        }
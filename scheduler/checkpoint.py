@@ -0,0 +1,125 @@
+# Checkpoints of a running genetic algorithm.
+#
+# A checkpoint holds everything the run needs to continue exactly as if it had not been
+# stopped: the generation counter, the budget counters, the state of the random module, the
+# population in order with the fitness of every schedule, and the best schedule so far.
+# Schedules are stored in the Schedule.pack() encoding, so a checkpoint is a few kilobytes
+# of little-endian binary data:
+#
+#   header      magic, format version, problem fingerprint
+#   run         generation, evaluations, best fitness, generation of the last improvement, base seed
+#   rng         random.getstate(): version, 625 words of the Mersenne Twister state, gauss_next
+#   schedules   count, then fitness, length and int32 lesson data of each schedule; the best one last
+#
+# Checkpoints are written to a temporary file and renamed, so a crash while writing leaves
+# the previous checkpoint intact.
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'GACP'
+VERSION = 1
+HEADER = struct.Struct('<4sH8s')
+RUN = struct.Struct('<iqdiQ?')
+RNG = struct.Struct('<iI?d')
+SCHEDULE = struct.Struct('<dI')
+
+class Checkpoint:
+    def __init__(self, generation, evaluations, best_fitness, improved_at, rng_state, population, best,
+                 base_seed=None):
+        self.generation = generation
+        self.evaluations = evaluations
+        self.best_fitness = best_fitness
+        self.improved_at = improved_at
+        self.rng_state = rng_state  # random.getstate()
+        self.population = population  # [(Schedule.pack() data, fitness)] in population order
+        self.best = best  # (data, fitness) of the best schedule so far
+        self.base_seed = base_seed  # Seed of the worker streams in parallel.py
+
+def problem_fingerprint(problem):
+    # Guards against resuming a run with different input data
+    digest = hashlib.blake2b(digest_size=8)
+    for auditorium in problem.auditoriums:
+        digest.update(f'A|{auditorium.id}|{auditorium.capacity}\n'.encode())
+    for group in problem.groups:
+        digest.update(f'G|{group.number}|{group.size}|{";".join(group.subgroups)}\n'.encode())
+    for lecturer in problem.lecturers:
+        digest.update(f'L|{lecturer.id}|{",".join(lecturer.subjects_can_teach)}|{",".join(lecturer.types_can_teach)}|'
+                      f'{lecturer.max_hours_per_week}\n'.encode())
+    for subject in problem.subjects:
+        digest.update(f'S|{subject.id}|{subject.group_id}|{subject.num_lectures}|{subject.num_practicals}|'
+                      f'{subject.requires_subgroups}\n'.encode())
+    digest.update(f'U|{sorted(problem.unavailable_lecturers)}|{sorted(problem.unavailable_auditoriums)}\n'.encode())
+    return digest.digest()
+
+def int32_bytes(data, typecode='i'):
+    data = array(typecode, data)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+def int32_array(buffer, offset, length, typecode='i'):
+    if offset + 4 * length > len(buffer):
+        raise ValueError("Truncated checkpoint")
+    data = array(typecode)
+    data.frombytes(buffer[offset:offset + 4 * length])
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+def encode(problem, checkpoint):
+    version, words, gauss_next = checkpoint.rng_state
+    chunks = [
+        HEADER.pack(MAGIC, VERSION, problem_fingerprint(problem)),
+        RUN.pack(checkpoint.generation, checkpoint.evaluations, checkpoint.best_fitness, checkpoint.improved_at,
+                 checkpoint.base_seed or 0, checkpoint.base_seed is not None),
+        RNG.pack(version, len(words), gauss_next is not None, gauss_next or 0.0),
+        int32_bytes(words, 'I'),
+        struct.pack('<I', len(checkpoint.population)),
+    ]
+    for data, fitness in checkpoint.population + [checkpoint.best]:
+        chunks.append(SCHEDULE.pack(fitness, len(data)))
+        chunks.append(int32_bytes(data))
+    return b''.join(chunks)
+
+def decode(problem, buffer):
+    buffer = memoryview(buffer)
+    try:
+        magic, version, fingerprint = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a checkpoint of this version")
+        if fingerprint != problem_fingerprint(problem):
+            raise ValueError("The checkpoint was written for different input data")
+        offset = HEADER.size
+        generation, evaluations, best_fitness, improved_at, base_seed, has_base_seed = RUN.unpack_from(buffer, offset)
+        offset += RUN.size
+        rng_version, length, has_gauss, gauss_next = RNG.unpack_from(buffer, offset)
+        offset += RNG.size
+        words = int32_array(buffer, offset, length, 'I')
+        offset += 4 * length
+        rng_state = (rng_version, tuple(words), gauss_next if has_gauss else None)
+        count, = struct.unpack_from('<I', buffer, offset)
+        offset += 4
+        schedules = []
+        for _ in range(count + 1):
+            fitness, length = SCHEDULE.unpack_from(buffer, offset)
+            offset += SCHEDULE.size
+            schedules.append((int32_array(buffer, offset, length), fitness))
+            offset += 4 * length
+    except struct.error as error:
+        raise ValueError(f"Truncated checkpoint: {error}") from None
+    return Checkpoint(generation, evaluations, best_fitness, improved_at, rng_state, schedules[:-1], schedules[-1],
+                      base_seed if has_base_seed else None)
+
+def save(path, problem, checkpoint):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(encode(problem, checkpoint))
+    os.replace(temporary, path)
+
+def load(path, problem):
+    with open(path, 'rb') as file:
+        return decode(problem, file.read())
@@ -0,0 +1,228 @@
+# Command line interface: python -m scheduler
+import argparse
+import os
+import signal
+import sys
+from contextlib import nullcontext
+from datetime import date
+
+from . import output
+from .ga import Config, solve
+from .incremental import ChangeSet, apply_changes, reschedule
+from .local_search import NEIGHBOURHOODS
+from .problem import load_problem
+from .profiling import ENVIRONMENT_VARIABLE, MODES, Profile
+from .selection import REPLACEMENTS, SELECTIONS
+
+def lesson_arg(value):
+    subject_id, separator, lesson_type = value.partition(':')
+    if not separator:
+        raise argparse.ArgumentTypeError("expected SUBJECT:TYPE, e.g. S1:Лекція")
+    return subject_id, lesson_type
+
+def view_arg(value):
+    view, separator, name = value.partition(':')
+    if not separator or view not in output.VIEWS:
+        raise argparse.ArgumentTypeError(f"expected VIEW:ID with VIEW one of {', '.join(output.VIEWS)}, e.g. group:TTP-41")
+    return view, name
+
+def monday_arg(value):
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date as YYYY-MM-DD, got {value!r}") from None
+    if day.weekday() != 0:
+        raise argparse.ArgumentTypeError(f"the term must start on a Monday, {day} is a {day:%A}")
+    return day
+
+def parse_args(argv=None):
+    defaults = Config()
+    parser = argparse.ArgumentParser(prog='scheduler', description="Generate a university timetable with a genetic algorithm")
+    parser.add_argument('--input-dir', default='.', help="Directory with auditoriums.csv, groups.csv, lecturers.csv and subjects.csv")
+    parser.add_argument('--problem-cache', metavar='FILE',
+                        help="Binary cache of the parsed input files, rebuilt whenever they change")
+    parser.add_argument('--population-size', type=int, default=defaults.population_size)
+    parser.add_argument('--generations', type=int, default=defaults.generations)
+    parser.add_argument('--seed', type=int, default=None, help="Seed for a reproducible run")
+    parser.add_argument('--workers', type=int, default=defaults.workers, help="Worker processes for offspring production")
+    parser.add_argument('--islands', type=int, default=defaults.islands, help="Number of islands in the island model")
+    parser.add_argument('--topology', choices=['ring', 'full'], default=defaults.topology)
+    parser.add_argument('--migration-interval', type=int, default=defaults.migration_interval)
+    parser.add_argument('--migration-size', type=int, default=defaults.migration_size)
+    parser.add_argument('--time-limit', type=float, default=None, help="Stop after this many seconds with the best schedule so far")
+    parser.add_argument('--max-evaluations', type=int, default=None, help="Stop before exceeding this many fitness evaluations")
+    parser.add_argument('--stagnation', type=int, default=None, dest='stagnation_generations',
+                        help="Stop after this many generations without improvement")
+    parser.add_argument('--initialization', choices=['random', 'greedy'], default=defaults.initialization,
+                        help="How the initial population is built")
+    parser.add_argument('--selection', choices=sorted(SELECTIONS), default=defaults.selection,
+                        help="How the parents of the next generation are chosen")
+    parser.add_argument('--tournament-size', type=int, default=defaults.tournament_size,
+                        help="Schedules per tournament of the tournament selection")
+    parser.add_argument('--steady-state', type=int, default=defaults.steady_state, metavar='N',
+                        help="Replace N schedules at a time in place instead of whole generations")
+    parser.add_argument('--replacement', choices=sorted(REPLACEMENTS), default=defaults.replacement,
+                        help="Which schedules steady-state children replace")
+    parser.add_argument('--target-fitness', type=float, default=None, help="Stop once the best fitness reaches this value")
+    parser.add_argument('--memetic', type=int, default=defaults.memetic_individuals, dest='memetic_individuals',
+                        help="Best schedules improved by local search every generation")
+    parser.add_argument('--memetic-moves', type=int, default=defaults.memetic_moves, help="Local search moves per schedule")
+    parser.add_argument('--memetic-neighbourhoods', nargs='+', choices=NEIGHBOURHOODS, default=None,
+                        help="Local search moves to use, all by default")
+    parser.add_argument('--telemetry', dest='telemetry_path', metavar='FILE',
+                        help="JSON Lines file with one record of metrics per generation")
+    parser.add_argument('--checkpoint', dest='checkpoint_path', help="File for periodic checkpoints of the run")
+    parser.add_argument('--checkpoint-interval', type=int, default=defaults.checkpoint_interval,
+                        help="Generations between checkpoints")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint file if it exists")
+    parser.add_argument('--initial-schedule', help="JSON schedule (from --format json) to warm-start from")
+    parser.add_argument('--warm-start-mutations', type=int, default=defaults.warm_start_mutations,
+                        help="Mutations applied to each copy of the initial schedule")
+    parser.add_argument('--remove-lecturer', action='append', default=[], metavar='ID',
+                        help="Reschedule the initial schedule without this lecturer")
+    parser.add_argument('--close-auditorium', action='append', default=[], metavar='ID',
+                        help="Reschedule the initial schedule without this auditorium")
+    parser.add_argument('--add-lesson', action='append', default=[], metavar='SUBJECT:TYPE', type=lesson_arg,
+                        help="Reschedule the initial schedule with one more lesson of a subject")
+    parser.add_argument('--no-batch-fitness', dest='batch_fitness', action='store_false',
+                        help="Evaluate schedules one by one instead of with NumPy")
+    parser.add_argument('--fitness-cache', type=float, default=0, metavar='MB',
+                        help="Memory for caching the fitness of schedules seen before, 0 disables the cache")
+    parser.add_argument('--format', choices=['grid', 'json', 'csv', 'jsonl', 'ical'], default='grid',
+                        help="Output format of the best schedule")
+    parser.add_argument('--output', help="File for the best schedule instead of stdout")
+    parser.add_argument('--view', type=view_arg, metavar='VIEW:ID',
+                        help="Only the lessons of one group, lecturer or auditorium, e.g. lecturer:L1")
+    parser.add_argument('--term-start', type=monday_arg, metavar='YYYY-MM-DD',
+                        help="Monday of the first (even) week of the term, required by --format ical")
+    parser.add_argument('--term-weeks', type=int, default=16, help="Length of the term for --format ical")
+    parser.add_argument('--profile', choices=MODES, default=os.environ.get(ENVIRONMENT_VARIABLE) or None,
+                        help=f"Count and time the hot-path functions of the run, default from ${ENVIRONMENT_VARIABLE}")
+    parser.add_argument('--profile-output', metavar='FILE', help="File for the profile report instead of stderr")
+    parser.add_argument('--quiet', action='store_true', help="Do not print the progress")
+    args = parser.parse_args(argv)
+    if args.profile not in (None,) + MODES:
+        parser.error(f"${ENVIRONMENT_VARIABLE} must be one of {', '.join(MODES)}")
+    if (args.remove_lecturer or args.close_auditorium or args.add_lesson) and not args.initial_schedule:
+        parser.error("--remove-lecturer, --close-auditorium and --add-lesson need --initial-schedule")
+    if args.steady_state and args.workers and not args.islands:
+        parser.error("--steady-state does not work with --workers")
+    if args.format == 'ical' and args.term_start is None:
+        parser.error("--format ical needs --term-start")
+    if args.term_weeks < 1:
+        parser.error("--term-weeks must be at least 1")
+    if args.view and args.format == 'json':
+        parser.error("--view does not apply to --format json, which is read back by --initial-schedule")
+    return args
+
+def config_from_args(args):
+    return Config(
+        population_size=args.population_size,
+        generations=args.generations,
+        seed=args.seed,
+        batch_fitness=args.batch_fitness,
+        workers=args.workers,
+        islands=args.islands,
+        migration_interval=args.migration_interval,
+        migration_size=args.migration_size,
+        topology=args.topology,
+        time_limit=args.time_limit,
+        max_evaluations=args.max_evaluations,
+        stagnation_generations=args.stagnation_generations,
+        target_fitness=args.target_fitness,
+        initialization=args.initialization,
+        selection=args.selection,
+        tournament_size=args.tournament_size,
+        steady_state=args.steady_state,
+        replacement=args.replacement,
+        memetic_individuals=args.memetic_individuals,
+        memetic_moves=args.memetic_moves,
+        memetic_neighbourhoods=args.memetic_neighbourhoods,
+        telemetry_path=args.telemetry_path,
+        checkpoint_path=args.checkpoint_path,
+        checkpoint_interval=args.checkpoint_interval,
+        resume=args.resume,
+        warm_start_mutations=args.warm_start_mutations,
+        fitness_cache_bytes=int(args.fitness_cache * 2**20),
+        # Progress goes to stdout, which the exported schedule needs for itself
+        verbose=not args.quiet and (args.format == 'grid' or args.output is not None),
+    )
+
+def write_profile(profile, path):
+    if path:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(profile.report())
+    else:
+        print(profile.report(), file=sys.stderr)
+
+def interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    args = parse_args(argv)
+    # A terminated run still prints the best schedule found so far
+    signal.signal(signal.SIGTERM, interrupt)
+    problem = load_problem(args.input_dir, args.problem_cache)
+    report = problem.report
+    for issue in report.errors:
+        print(f"Error: {issue}", file=sys.stderr)
+    for warning in problem.warnings:
+        print(f"Warning: {warning}", file=sys.stderr)
+    omitted = sum(report.counts.values()) - len(report.issues)
+    if omitted:
+        print(f"... and {omitted} more issues", file=sys.stderr)
+    if report.counts['error']:
+        # Skipped rows would silently change the timetable
+        print(f"Invalid input data ({report.summary()})", file=sys.stderr)
+        return 1
+    if args.view:
+        view, name = args.view
+        table = getattr(problem, output.VIEWS[view][0])
+        if table.handle(name) is None:
+            print(f"Unknown {table.kind} {name} in --view", file=sys.stderr)
+            return 1
+    config = config_from_args(args)
+    changes = ChangeSet(args.remove_lecturer, args.close_auditorium, args.add_lesson)
+    try:
+        apply_changes(problem, changes)  # Unknown IDs and lesson types are reported before the run
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    initial_schedule = None
+    if args.initial_schedule:
+        with open(args.initial_schedule, encoding='utf-8') as file:
+            initial_schedule = output.read_json(problem, file)
+    with Profile(args.profile) if args.profile else nullcontext() as profile:
+        if initial_schedule is None:
+            result = solve(problem, config)
+        elif changes.removed_lecturers or changes.unavailable_auditoriums or changes.extra_lessons:
+            result = reschedule(problem, initial_schedule, changes, config)
+        else:
+            config.initial_schedule = initial_schedule
+            result = solve(problem, config)
+    if profile is not None:
+        write_profile(profile, args.profile_output)
+    if not args.quiet:
+        print(f"Stopped after {result.generations} generations ({result.stop_reason}), "
+              f"{result.evaluations} evaluations, best fitness {result.fitness}", file=sys.stderr)
+        if result.cache_stats:
+            stats = result.cache_stats
+            print(f"Fitness cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), "
+                  f"{stats['evictions']} evictions", file=sys.stderr)
+    view, name = args.view or (None, None)
+    file = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'grid':
+            output.print_schedule(result.schedule, view, name, file)
+        elif args.format == 'json':
+            output.write_json(result.schedule, file)
+        elif args.format == 'csv':
+            output.write_csv(result.schedule, file, view, name)
+        elif args.format == 'jsonl':
+            output.write_jsonl(result.schedule, file, view, name)
+        else:
+            output.write_ical(result.schedule, file, args.term_start, args.term_weeks, view, name)
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    return 0
@@ -0,0 +1,126 @@
+# Constraint-aware greedy construction of schedules (DSATUR-style).
+#
+# Every unplaced lesson keeps a bit mask of the (week, time slot) pairs where it could still go:
+# its group or subgroup is free and at least one of its eligible lecturers is free. The lesson
+# with the fewest options goes next, ties broken by fewer eligible lecturers, fewer fitting
+# auditoriums and then at random, so repeated calls give different schedules. A lesson is put
+# where it adds the least gap and overload penalty, again choosing at random among equally good
+# places, with a random free auditorium that fits. Placing a lesson only changes one
+# (week, time slot) pair, so only the masks of lessons of the same group or with the same
+# eligible lecturer are updated.
+
+import heapq
+import random
+
+from .operators import get_possible_lecturers, required_lessons
+from .schedule import EMPTY_DAY, SLOT_POSITION, TIME_SLOTS, WEEKS, Schedule, day_gaps
+
+SLOTS = [(week, time_slot) for week in WEEKS for time_slot in TIME_SLOTS]
+SLOT_BIT = {slot: bit for bit, slot in enumerate(SLOTS)}
+ALL_SLOTS = (1 << len(SLOTS)) - 1
+
+def group_free(lesson, occupied):
+    # The group part of is_conflict
+    if lesson.subgroup:
+        return (('subgroup', lesson.group_index, lesson.subgroup) not in occupied and
+                ('whole', lesson.group_index) not in occupied)
+    return ('group', lesson.group_index) not in occupied
+
+GAP_INCREASES = {}  # lessons per period of a day -> gap increase of one more lesson in each period
+
+def gap_increases(period_counts):
+    increases = GAP_INCREASES.get(period_counts)
+    if increases is None:
+        gaps = day_gaps(period_counts)
+        increases = GAP_INCREASES[period_counts] = tuple(
+            day_gaps(period_counts[:period] + (count + 1,) + period_counts[period + 1:]) - gaps
+            for period, count in enumerate(period_counts))
+    return increases
+
+def gap_increase(schedule, week, entity, time_slot):
+    day, period = SLOT_POSITION[time_slot]
+    return gap_increases(schedule.day_periods.get((week, entity, day), EMPTY_DAY))[period]
+
+def placements(schedule, lesson, lecturers, mask):
+    # (penalty increase, random tie-break, week, time slot, lecturer) for every place left in mask
+    problem = schedule.problem
+    group_entity = ('group', lesson.group_index, lesson.subgroup)
+    counts_gaps = (lesson.group_index, lesson.subgroup) in problem.gap_buckets
+    result = []
+    for bit, (week, time_slot) in enumerate(SLOTS):
+        if not mask >> bit & 1:
+            continue
+        occupied = schedule.timetable(week).occupancy[time_slot]
+        group_cost = gap_increase(schedule, week, group_entity, time_slot) if counts_gaps else 0
+        for lecturer_index in lecturers:
+            if ('lecturer', lecturer_index) in occupied:
+                continue
+            hours = schedule.lecturer_hours.get((week, lecturer_index), 0)
+            cost = group_cost + gap_increase(schedule, week, ('lecturer', lecturer_index), time_slot)
+            if hours >= problem.lecturer_max_hours[lecturer_index]:
+                cost += 2
+            result.append((cost, random.random(), week, time_slot, lecturer_index))
+    return result
+
+def free_auditorium(auditoriums, occupied):
+    # A random free auditorium from the list, None if all are taken
+    if not auditoriums:
+        return None
+    start = random.randrange(len(auditoriums))
+    for i in range(len(auditoriums)):
+        auditorium = auditoriums[(start + i) % len(auditoriums)]
+        if ('auditorium', auditorium.index) not in occupied:
+            return auditorium
+    return None
+
+def greedy_schedule(problem):
+    schedule = Schedule(problem)
+    lessons = required_lessons(problem)
+    lecturers = [[lecturer.index for lecturer in get_possible_lecturers(problem, lesson)] for lesson in lessons]
+    auditoriums = [problem.auditorium_index.fitting(problem.students(lesson.group_index, lesson.subgroup))
+                   for lesson in lessons]
+    # Unplaced lessons that share a group or an eligible lecturer, i.e. whose options a placement can change
+    by_group = {}
+    by_lecturer = {}
+    for i, lesson in enumerate(lessons):
+        by_group.setdefault(lesson.group_index, []).append(i)
+        for lecturer_index in lecturers[i]:
+            by_lecturer.setdefault(lecturer_index, []).append(i)
+    masks = [ALL_SLOTS] * len(lessons)
+    done = [False] * len(lessons)
+    heap = []
+
+    def push(i):
+        heapq.heappush(heap, (bin(masks[i]).count('1'), len(lecturers[i]), len(auditoriums[i]), random.random(), i))
+
+    for i in range(len(lessons)):
+        if lecturers[i] and auditoriums[i]:
+            push(i)
+        else:
+            done[i] = True  # Cannot be placed at all
+    while heap:
+        options, _, _, _, i = heapq.heappop(heap)
+        if done[i] or options != bin(masks[i]).count('1'):
+            continue  # Placed already, or an outdated entry
+        done[i] = True
+        lesson = lessons[i]
+        for _, _, week, time_slot, lecturer_index in sorted(placements(schedule, lesson, lecturers[i], masks[i])):
+            auditorium = free_auditorium(auditoriums[i], schedule.timetable(week).occupancy[time_slot])
+            if auditorium is None:
+                continue
+            lesson.time_slot = time_slot
+            lesson.lecturer_index = lecturer_index
+            lesson.auditorium_index = auditorium.index
+            schedule.add_lesson(week, time_slot, lesson)
+            break
+        else:
+            continue  # Left out, shows up in the subject penalties
+        bit = SLOT_BIT[(week, time_slot)]
+        occupied = schedule.timetable(week).occupancy[time_slot]
+        for j in set(by_group[lesson.group_index] + by_lecturer[lecturer_index]):
+            if done[j] or not masks[j] >> bit & 1:
+                continue
+            if not group_free(lessons[j], occupied) or all(('lecturer', other) in occupied for other in lecturers[j]):
+                masks[j] &= ~(1 << bit)
+                push(j)
+    return schedule
@@ -0,0 +1,223 @@
+# Input data: entities, CSV readers and the registry that interns them
+import csv
+import re
+
+from .schedule import LESSON_TYPES
+
+# Data Structures
+class Auditorium:
+    def __init__(self, auditorium_id, capacity):
+        self.id = auditorium_id
+        self.capacity = int(capacity)
+
+class Group:
+    def __init__(self, group_number, student_amount, subgroups):
+        self.number = group_number
+        self.size = int(student_amount)
+        self.subgroups = subgroups.strip('"').split(';') if subgroups else []
+
+class Lecturer:
+    def __init__(self, lecturer_id, name, subjects_can_teach, types_can_teach, max_hours_per_week):
+        self.id = lecturer_id
+        self.name = name
+        # Updated parsing to handle commas and semicolons
+        self.subjects_can_teach = [s.strip() for s in re.split(';|,', subjects_can_teach)] if subjects_can_teach else []
+        self.types_can_teach = [t.strip() for t in re.split(';|,', types_can_teach)] if types_can_teach else []
+        self.max_hours_per_week = int(max_hours_per_week)
+
+class Subject:
+    def __init__(self, subject_id, name, group_id, num_lectures, num_practicals, requires_subgroups, week_type):
+        self.id = subject_id
+        self.name = name
+        self.group_id = group_id
+        self.num_lectures = int(num_lectures)
+        self.num_practicals = int(num_practicals)
+        self.requires_subgroups = True if requires_subgroups.lower() == 'yes' else False
+        self.week_type = week_type.lower()  # 'both', 'even', 'odd'
+
+# Problems found in the input files, collected instead of printed
+class Issue:
+    def __init__(self, severity, message, file=None, line=None, column=None):
+        self.severity = severity  # 'error': the row was skipped, 'warning': loaded but probably wrong
+        self.message = message
+        self.file = file
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        location = ':'.join(str(part) for part in (self.file, self.line) if part is not None)
+        column = f" ({self.column})" if self.column else ''
+        return f"{location}{column}: {self.message}" if location else self.message
+
+class LoadReport:
+    # At most max_issues issues are kept so that a broken file of any size needs bounded memory,
+    # the counts include the dropped ones
+    def __init__(self, max_issues=1000):
+        self.max_issues = max_issues
+        self.issues = []
+        self.counts = {'error': 0, 'warning': 0}
+        self.rows = {}  # file -> data rows read
+
+    def add(self, severity, message, file=None, line=None, column=None):
+        self.counts[severity] += 1
+        if len(self.issues) < self.max_issues:
+            self.issues.append(Issue(severity, message, file, line, column))
+
+    def error(self, message, *location):
+        self.add('error', message, *location)
+
+    def warning(self, message, *location):
+        self.add('warning', message, *location)
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+    def summary(self):
+        rows = sum(self.rows.values())
+        return f"{rows} rows, {self.counts['error']} errors, {self.counts['warning']} warnings"
+
+# Column checks of the schemas: raise ValueError for an invalid value
+def text(value):
+    if not value.strip():
+        raise ValueError("empty value")
+
+def optional(value):
+    pass
+
+def count(value):
+    if not value.strip().isdecimal():
+        raise ValueError(f"expected a non-negative integer, got {value!r}")
+
+def one_of(*choices):
+    def check(value):
+        if value.lower() not in choices:
+            raise ValueError(f"expected one of {', '.join(choices)}, got {value!r}")
+    return check
+
+# File -> entity class and its (column, check) pairs in constructor argument order
+SCHEMAS = {
+    'auditoriums': (Auditorium, [('auditoriumID', text), ('capacity', count)]),
+    'groups': (Group, [('groupNumber', text), ('studentAmount', count), ('subgroups', optional)]),
+    'lecturers': (Lecturer, [('lecturerID', text), ('lecturerName', optional), ('subjectsCanTeach', optional),
+                             ('typesCanTeach', optional), ('maxHoursPerWeek', count)]),
+    'subjects': (Subject, [('id', text), ('name', optional), ('groupID', text), ('numLectures', count),
+                           ('numPracticals', count), ('requiresSubgroups', one_of('yes', 'no')),
+                           ('weekType', one_of('both', 'even', 'odd'))]),
+}
+
+def read_entities(kind, filename, report):
+    # Streams the entities of one input file, one row at a time. Invalid rows are reported and skipped;
+    # each entity remembers where it came from in entity.source for later cross-reference checks.
+    entity_class, columns = SCHEMAS[kind]
+    with open(filename, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile, delimiter=';')
+        header = next(reader, None)
+        if header is None:
+            report.error("empty file, expected a header row", filename, 1)
+            return
+        positions = {name.strip(): position for position, name in enumerate(header)}
+        missing = [name for name, _ in columns if name not in positions]
+        if missing:
+            report.error(f"missing columns {', '.join(missing)}", filename, 1)
+            return
+        positions = [(name, check, positions[name]) for name, check in columns]
+        rows = 0
+        for row in reader:
+            if not any(row):
+                continue  # Blank line
+            rows += 1
+            line = reader.line_num
+            if len(row) != len(header):
+                report.error(f"expected {len(header)} fields, got {len(row)}", filename, line)
+                continue
+            try:
+                for name, check, position in positions:
+                    check(row[position])
+            except ValueError as error:
+                report.error(str(error), filename, line, name)
+                continue
+            entity = entity_class(*(row[position] for _, _, position in positions))
+            entity.source = (filename, line)
+            yield entity
+        report.rows[filename] = rows
+
+def read_auditoriums(filename, report=None):
+    return list(read_entities('auditoriums', filename, report or LoadReport()))
+
+def read_groups(filename, report=None):
+    return list(read_entities('groups', filename, report or LoadReport()))
+
+def read_lecturers(filename, report=None):
+    return list(read_entities('lecturers', filename, report or LoadReport()))
+
+def read_subjects(filename, report=None):
+    return list(read_entities('subjects', filename, report or LoadReport()))
+
+class EntityTable:
+    # Interned entities of one kind: dense integer handles, O(1) handle -> entity and name -> handle lookups
+    def __init__(self, kind, name_attribute, entities, report):
+        self.kind = kind
+        self.entities = []
+        self.handles = {}
+        for entity in entities:
+            name = getattr(entity, name_attribute)
+            if name in self.handles:
+                report.warning(f"Duplicate {kind} {name} ignored.", *source(entity))
+                continue
+            entity.index = len(self.entities)
+            self.handles[name] = entity.index
+            self.entities.append(entity)
+
+    def __getitem__(self, index):
+        return self.entities[index]
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def handle(self, name):
+        return self.handles.get(name)
+
+def source(entity):
+    # (file, line) of an entity read by read_entities, () for one made in code
+    return getattr(entity, 'source', ())
+
+class Registry:
+    # Every entity is loaded once and shared by all lessons and schedules through its integer handle.
+    # The tables accept any iterables, so the entities can be streamed straight from the files.
+    def __init__(self, auditoriums, groups, lecturers, subjects, report=None):
+        self.report = report if report is not None else LoadReport()
+        self.auditoriums = EntityTable('auditorium', 'id', auditoriums, self.report)
+        self.groups = EntityTable('group', 'number', groups, self.report)
+        self.lecturers = EntityTable('lecturer', 'id', lecturers, self.report)
+        self.subjects = EntityTable('subject', 'id', subjects, self.report)
+        # Cross-references
+        taught = set()
+        for lecturer in self.lecturers:
+            taught.update(lecturer.subjects_can_teach)
+            unknown = [lesson_type for lesson_type in lecturer.types_can_teach if lesson_type not in LESSON_TYPES]
+            if unknown:
+                self.report.warning(f"Unknown lesson types {', '.join(unknown)} of lecturer {lecturer.id}", *source(lecturer))
+        for subject in self.subjects:
+            subject.group_index = self.groups.handle(subject.group_id)
+            if subject.group_index is None:
+                self.report.warning(f"Group {subject.group_id} not found for subject {subject.name}", *source(subject))
+            if subject.id not in taught:
+                self.report.warning(f"No lecturers available for subject {subject.id}", *source(subject))
+
+    @property
+    def warnings(self):
+        return [str(issue) for issue in self.report.warnings]
+
+def load_registry(paths, report=None):
+    # paths: INPUT_FILES key -> file; the files are streamed in dependency order, errors go to the report
+    report = report if report is not None else LoadReport()
+    return Registry(*(read_entities(kind, paths[kind], report) for kind in ('auditoriums', 'groups', 'lecturers', 'subjects')),
+                    report)
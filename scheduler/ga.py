@@ -0,0 +1,222 @@
+# Genetic algorithm driver and the public solve() entry point
+import os
+import random
+import time
+
+from . import checkpoint
+from .operators import (create_initial_population, elite_count, next_generation, steady_state_generation,
+                        warm_start_population)
+from .schedule import Schedule
+from .telemetry import Telemetry
+
+class Config:
+    def __init__(self, population_size=50, generations=100, seed=None, batch_fitness=True, workers=0,
+                 islands=0, migration_interval=10, migration_size=2, topology='ring', verbose=False,
+                 time_limit=None, max_evaluations=None, stagnation_generations=None,
+                 checkpoint_path=None, checkpoint_interval=10, resume=False,
+                 initial_schedule=None, warm_start_mutations=1, target_fitness=None, initialization='random',
+                 memetic_individuals=0, memetic_moves=200, memetic_neighbourhoods=None, fitness_cache_bytes=0,
+                 selection='truncation', tournament_size=3, progress=None, telemetry_path=None, steady_state=0,
+                 replacement='worst'):
+        self.population_size = population_size
+        self.generations = generations
+        self.seed = seed
+        self.batch_fitness = batch_fitness  # Score whole populations with genome.GenomeCodec when NumPy is available
+        self.workers = workers  # Worker processes for producing offspring (see parallel.py), 0 runs in this process
+        self.islands = islands  # Sub-populations evolving in separate processes (see islands.py), 0 disables them
+        self.migration_interval = migration_interval  # Generations between migrations between islands
+        self.migration_size = migration_size  # Best schedules sent to each neighbouring island
+        self.topology = topology  # 'ring' or 'full'
+        self.verbose = verbose  # Print the best fitness every 10 generations
+        self.progress = progress  # Called with (generation, best fitness) after every generation, e.g. by service.py
+        self.telemetry_path = telemetry_path  # JSON Lines file with one record per generation (see telemetry.py)
+        # Anytime mode: the run stops at whichever limit comes first and returns the best schedule so far
+        self.time_limit = time_limit  # Wall-clock seconds for the whole run
+        self.max_evaluations = max_evaluations  # Fitness evaluations for the whole run (shared by the islands)
+        self.stagnation_generations = stagnation_generations  # Stop after this many generations without improvement
+        self.target_fitness = target_fitness  # Stop as soon as the best schedule is at least this good
+        # Checkpoints (see checkpoint.py) are written every checkpoint_interval generations and when the run stops.
+        # With resume the run continues from checkpoint_path if it exists; the time limit starts anew.
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        # 'random' places lessons in random order into random free slots, 'greedy' uses construct.greedy_schedule
+        self.initialization = initialization
+        # Warm start: the population is the initial schedule and copies of it with warm_start_mutations mutations
+        self.initial_schedule = initial_schedule
+        self.warm_start_mutations = warm_start_mutations
+        # Memetic step (see local_search.py): hill climbing on the best schedules of every generation
+        self.memetic_individuals = memetic_individuals  # Schedules improved per generation, 0 disables the step
+        self.memetic_moves = memetic_moves  # Moves tried per schedule
+        self.memetic_neighbourhoods = memetic_neighbourhoods  # Names from local_search.NEIGHBOURHOODS, None for all
+        # Memory for cache.FitnessCache, which scores every distinct schedule once (per process), 0 disables it
+        self.fitness_cache_bytes = fitness_cache_bytes
+        # Mating pool: 'truncation', 'tournament' or 'sus' (see selection.py)
+        self.selection = selection
+        self.tournament_size = tournament_size
+        # Steady state (see operators.steady_state_generation): children are made steady_state at a time and
+        # replace schedules chosen by replacement, 'worst' or 'tournament' (see selection.py), in place.
+        # A generation is still population_size minus the elites children. 0 replaces whole generations.
+        self.steady_state = steady_state
+        self.replacement = replacement
+
+class Result:
+    def __init__(self, schedule, generations, islands=None, stop_reason=None, evaluations=None, cache_stats=None):
+        self.schedule = schedule
+        self.fitness = schedule.fitness
+        self.generations = generations  # Generations actually run
+        self.islands = islands  # Per-island results of the island model
+        # 'optimal', 'target', 'generations', 'time_limit', 'evaluations', 'stagnation' or 'interrupted'
+        self.stop_reason = stop_reason
+        self.evaluations = evaluations
+        self.cache_stats = cache_stats  # FitnessCache.stats() of a run in this process
+
+class Budget:
+    # Stopping rules of a run. The limits are checked between generations, and a generation
+    # is only started if it fits into the remaining time and evaluations.
+    def __init__(self, config, islands=1, started=None):
+        self.started = time.monotonic() if started is None else started
+        self.deadline = self.started + config.time_limit if config.time_limit is not None else None
+        self.generations = config.generations
+        self.max_evaluations = config.max_evaluations // islands if config.max_evaluations is not None else None
+        self.stagnation_generations = config.stagnation_generations
+        self.target_fitness = config.target_fitness
+        self.offspring = config.population_size - elite_count(config.population_size)
+        self.evaluations = 0
+        self.best_fitness = None
+        self.improved_at = 0  # Generation of the last improvement of the best fitness
+        self.generation_seconds = 0.0  # Duration of the last generation
+        self.last_record = self.started
+
+    def record(self, generation, best_fitness, evaluations):
+        now = time.monotonic()
+        self.generation_seconds = now - self.last_record
+        self.last_record = now
+        self.evaluations += evaluations
+        if self.best_fitness is None or best_fitness > self.best_fitness:
+            self.best_fitness = best_fitness
+            self.improved_at = generation
+
+    def restore(self, state):
+        self.evaluations = state.evaluations
+        self.best_fitness = state.best_fitness
+        self.improved_at = state.improved_at
+
+    def stop_reason(self, generation):
+        # Why the run has to stop before the next generation, None to go on
+        if self.best_fitness == 1.0:
+            return 'optimal'
+        if self.target_fitness is not None and self.best_fitness >= self.target_fitness:
+            return 'target'
+        if generation >= self.generations:
+            return 'generations'
+        if self.stagnation_generations is not None and generation - self.improved_at >= self.stagnation_generations:
+            return 'stagnation'
+        if self.max_evaluations is not None and self.evaluations + self.offspring > self.max_evaluations:
+            return 'evaluations'
+        if self.deadline is not None and time.monotonic() + self.generation_seconds > self.deadline:
+            return 'time_limit'
+        return None
+
+def generation_step(config):
+    # The function turning a population into the next generation's
+    if config.steady_state:
+        return steady_state_generation
+    return next_generation
+
+def kept_best(config, schedule):
+    # The schedule to hold on to as the best so far. Steady-state replacement refills replaced
+    # schedules in place, so there the best one is kept as a (copy-on-write) clone.
+    return schedule.clone() if config.steady_state else schedule
+
+def report_generation(config, generation, best_fitness):
+    if config.progress is not None:
+        config.progress(generation + 1, best_fitness)
+    if config.verbose and ((generation + 1) % 10 == 0 or best_fitness == 1.0):
+        print(f'Generation {generation + 1}: Best Fitness = {best_fitness}\n')
+        if best_fitness == 1.0:
+            print(f'Optimal schedule found at generation {generation + 1}.')
+
+def initial_population(problem, config):
+    if config.initial_schedule is None:
+        return create_initial_population(problem, config)
+    schedule = config.initial_schedule
+    if schedule.problem is not problem:
+        schedule = Schedule.unpack(problem, schedule.pack())
+    return warm_start_population(schedule, config)
+
+def load_checkpoint(problem, config):
+    if config.resume and config.checkpoint_path and os.path.exists(config.checkpoint_path):
+        return checkpoint.load(config.checkpoint_path, problem)
+    return None
+
+def save_checkpoint(problem, config, generation, budget, population, best, base_seed=None):
+    # population and best are (Schedule.pack() data, fitness) pairs
+    checkpoint.save(config.checkpoint_path, problem, checkpoint.Checkpoint(
+        generation, budget.evaluations, budget.best_fitness, budget.improved_at, random.getstate(),
+        population, best, base_seed))
+
+def genetic_algorithm(problem, config):
+    budget = Budget(config)
+    cache = problem.use_fitness_cache(config.fitness_cache_bytes)
+    telemetry = Telemetry.open(config)
+    state = load_checkpoint(problem, config)
+    if state:
+        random.setstate(state.rng_state)
+        population = [Schedule.unpack(problem, data, fitness) for data, fitness in state.population]
+        best_schedule = Schedule.unpack(problem, *state.best)
+        budget.restore(state)
+        generation = state.generation
+    else:
+        if config.seed is not None:
+            random.seed(config.seed)
+        population = initial_population(problem, config)
+        best_schedule = kept_best(config, max(population, key=lambda x: x.fitness))
+        budget.record(0, best_schedule.fitness, len(population))
+        generation = 0
+        if telemetry:
+            telemetry.write_population(0, budget, population, {'initialization': budget.generation_seconds})
+
+    def save():
+        save_checkpoint(problem, config, generation, budget, [(schedule.pack(), schedule.fitness) for schedule in population],
+                        (best_schedule.pack(), best_schedule.fitness))
+
+    step = generation_step(config)
+    try:
+        while True:
+            stop_reason = budget.stop_reason(generation)
+            if stop_reason:
+                break
+            timings = {}
+            population = step(population, config, timings)
+            best = max(population, key=lambda x: x.fitness)
+            if best.fitness > best_schedule.fitness:
+                best_schedule = kept_best(config, best)
+            budget.record(generation + 1, best.fitness, budget.offspring)
+            report_generation(config, generation, best.fitness)
+            generation += 1
+            if telemetry:
+                telemetry.write_population(generation, budget, population, timings)
+            if config.checkpoint_path and generation % config.checkpoint_interval == 0:
+                save()
+    except KeyboardInterrupt:
+        # The best schedule so far is complete: it is never modified once evaluated, or a clone
+        # taken by kept_best in the steady-state mode. The random state is somewhere inside a generation, so the last checkpoint is kept.
+        stop_reason = 'interrupted'
+    finally:
+        if telemetry:
+            telemetry.close()
+    if config.checkpoint_path and stop_reason != 'interrupted':
+        save()
+    return Result(best_schedule, generation, stop_reason=stop_reason, evaluations=budget.evaluations,
+                  cache_stats=cache.stats() if cache else None)
+
+def solve(problem, config=None):
+    config = config or Config()
+    if config.islands:
+        from . import islands
+        return islands.genetic_algorithm(problem, config)
+    if config.workers:
+        from . import parallel
+        return parallel.genetic_algorithm(problem, config)
+    return genetic_algorithm(problem, config)
@@ -0,0 +1,197 @@
+# Integer-encoded genome and batched NumPy fitness evaluation.
+#
+# Every individual is a row of integer arrays with one column per lesson:
+#   kind       - index into GenomeCodec.kinds, i.e. (subject, type, group, subgroup); -1 pads the row
+#   slot       - week * len(time_slots) + index of the time slot (week 0 is even, week 1 is odd)
+#   lecturer   - registry handle of the lecturer, -1 if no lecturer is assigned
+#   auditorium - registry handle of the auditorium, -1 if no auditorium is assigned
+# GenomeCodec.evaluate() scores the whole population in one vectorized pass and returns
+# exactly the penalties computed by Schedule.calculate_fitness in schedule.py.
+
+import numpy as np
+
+WEEKS = 2  # even and odd week
+LESSON_TYPES = ('Лекція', 'Практика')
+MAX_CELLS = 1 << 22  # Upper bound on population * entities * slots handled in one chunk
+
+class Genomes:
+    def __init__(self, kind, slot, lecturer, auditorium):
+        self.kind = kind
+        self.slot = slot
+        self.lecturer = lecturer
+        self.auditorium = auditorium
+
+    def __len__(self):
+        return self.kind.shape[0]
+
+    def rows(self, start, stop):
+        return Genomes(self.kind[start:stop], self.slot[start:stop],
+                       self.lecturer[start:stop], self.auditorium[start:stop])
+
+def gap_table(periods_per_day):
+    # Number of free periods between the first and the last lesson of a day, for every occupancy bitmask
+    table = np.zeros(1 << periods_per_day, dtype=np.int64)
+    for mask in range(1, 1 << periods_per_day):
+        occupied = [p for p in range(periods_per_day) if mask >> p & 1]
+        table[mask] = occupied[-1] - occupied[0] + 1 - len(occupied)
+    return table
+
+class GenomeCodec:
+    def __init__(self, registry, days, periods):
+        self.groups = registry.groups
+        self.lecturers = registry.lecturers
+        self.subjects = registry.subjects
+        self.days_per_week = len(days)
+        self.periods_per_day = len(periods)
+        self.time_slots = [(day, period) for day in days for period in periods]
+        self.slot_index = {time_slot: i for i, time_slot in enumerate(self.time_slots)}
+        self.slots_per_week = len(self.time_slots)
+        # Every lesson that the operators can create is one of these kinds
+        self.kinds = []
+        self.kind_index = {}
+        for subject in self.subjects:
+            if subject.group_index is None:
+                continue
+            group = self.groups[subject.group_index]
+            for lesson_type in LESSON_TYPES:
+                for subgroup in [None] + group.subgroups:
+                    self._add_kind((subject.index, lesson_type, group.index, subgroup))
+        self._tables = None
+
+    def _add_kind(self, key):
+        if key not in self.kind_index:
+            self.kind_index[key] = len(self.kinds)
+            self.kinds.append(key)
+            self._tables = None
+        return self.kind_index[key]
+
+    def kind_of(self, lesson):
+        return self._add_kind((lesson.subject_index, lesson.type, lesson.group_index, lesson.subgroup))
+
+    # Encoding
+    def encode_schedule(self, schedule):
+        kinds, slots, lecturers, auditoriums = [], [], [], []
+        for week, timetable in enumerate((schedule.even_timetable, schedule.odd_timetable)):
+            offset = week * self.slots_per_week
+            for time_slot, lessons in timetable.items():
+                for lesson in lessons:
+                    kinds.append(self.kind_of(lesson))
+                    slots.append(offset + self.slot_index[time_slot])
+                    lecturers.append(-1 if lesson.lecturer_index is None else lesson.lecturer_index)
+                    auditoriums.append(-1 if lesson.auditorium_index is None else lesson.auditorium_index)
+        return kinds, slots, lecturers, auditoriums
+
+    def encode(self, schedules):
+        encoded = [self.encode_schedule(schedule) for schedule in schedules]
+        width = max((len(row[0]) for row in encoded), default=0)
+        arrays = [np.full((len(encoded), width), -1, dtype=np.int32) for _ in range(4)]
+        for i, row in enumerate(encoded):
+            n = len(row[0])
+            for array, values in zip(arrays, row):
+                array[i, :n] = values
+        return Genomes(*arrays)
+
+    # Lookup tables shared by all evaluations
+    def _build_tables(self):
+        n_kinds = len(self.kinds)
+        # Gap buckets: every group with each of its subgroups, or the whole group if it has none
+        buckets = {}
+        for group in self.groups:
+            for subgroup in (group.subgroups if group.subgroups else [None]):
+                buckets.setdefault((group.index, subgroup), len(buckets))
+        kind_bucket = np.array(
+            [buckets.get((group_index, subgroup), -1) for _, _, group_index, subgroup in self.kinds] or [-1],
+            dtype=np.int64)
+        # Subject hour requirements: one column per subject for lectures, per subject subgroup for practicals
+        lecture_columns, practical_columns = [], []
+        for subject in self.subjects:
+            if subject.group_index is None:
+                continue
+            group = self.groups[subject.group_index]
+            subgroups = group.subgroups if subject.requires_subgroups else [None]
+            lecture_columns.append((subject.index, group.index, len(subgroups), subject.num_lectures))
+            for subgroup in subgroups:
+                practical_columns.append((subject.index, group.index, subgroup, subject.num_practicals))
+        lecture_match = np.zeros((max(n_kinds, 1), len(lecture_columns)), dtype=np.int64)
+        for c, (subject_index, group_index, _, _) in enumerate(lecture_columns):
+            for k, (kind_subject, kind_type, kind_group, _) in enumerate(self.kinds):
+                if kind_type == 'Лекція' and kind_subject == subject_index and kind_group == group_index:
+                    lecture_match[k, c] = 1
+        practical_match = np.zeros((max(n_kinds, 1), len(practical_columns)), dtype=np.int64)
+        for c, (subject_index, group_index, subgroup, _) in enumerate(practical_columns):
+            for k, (kind_subject, kind_type, kind_group, kind_subgroup) in enumerate(self.kinds):
+                if (kind_type == 'Практика' and kind_subject == subject_index and kind_group == group_index
+                        and kind_subgroup == subgroup):
+                    practical_match[k, c] = 1
+        self._tables = {
+            'n_buckets': len(buckets),
+            'kind_bucket': kind_bucket,
+            'lecture_match': lecture_match,
+            'lecture_multiplier': np.array([c[2] for c in lecture_columns], dtype=np.int64),
+            'required_lectures': np.array([c[3] for c in lecture_columns], dtype=np.int64),
+            'practical_match': practical_match,
+            'required_practicals': np.array([c[3] for c in practical_columns], dtype=np.int64),
+            'max_hours': np.array([lecturer.max_hours_per_week for lecturer in self.lecturers], dtype=np.int64),
+            'gap_table': gap_table(self.periods_per_day),
+            'period_weights': 1 << np.arange(self.periods_per_day, dtype=np.int64),
+        }
+
+    # Evaluation
+    def _occupancy(self, rows, entities, slots, n_rows, n_entities):
+        # Lessons per (individual, entity, slot of either week)
+        n_slots = WEEKS * self.slots_per_week
+        flat = (rows * n_entities + entities) * n_slots + slots
+        counts = np.bincount(flat, minlength=n_rows * n_entities * n_slots)
+        return counts.reshape(n_rows, n_entities, n_slots)
+
+    def _gaps(self, counts):
+        n_rows, n_entities, _ = counts.shape
+        occupied = (counts > 0).reshape(n_rows, n_entities, WEEKS * self.days_per_week, self.periods_per_day)
+        masks = occupied @ self._tables['period_weights']
+        return self._tables['gap_table'][masks].sum(axis=(1, 2))
+
+    def _evaluate_chunk(self, genomes):
+        tables = self._tables
+        kind, slot, lecturer = genomes.kind, genomes.slot, genomes.lecturer
+        n_rows = len(genomes)
+        rows = np.broadcast_to(np.arange(n_rows)[:, None], kind.shape)
+        valid = (kind >= 0) & (slot >= 0)
+        safe_kind = np.where(valid, kind, 0)
+        penalty = np.zeros(n_rows, dtype=np.int64)
+
+        # Gaps for groups and subgroups
+        bucket = tables['kind_bucket'][safe_kind]
+        selected = valid & (bucket >= 0)
+        counts = self._occupancy(rows[selected], bucket[selected], slot[selected], n_rows, tables['n_buckets'])
+        penalty += self._gaps(counts)
+
+        # Gaps and weekly workload for lecturers
+        n_lecturers = len(self.lecturers)
+        selected = valid & (lecturer >= 0)
+        counts = self._occupancy(rows[selected], lecturer[selected], slot[selected], n_rows, n_lecturers)
+        penalty += self._gaps(counts)
+        hours = counts.reshape(n_rows, n_lecturers, WEEKS, self.slots_per_week).sum(axis=3)
+        overload = np.maximum(hours - tables['max_hours'][None, :, None], 0)
+        penalty += overload.sum(axis=(1, 2)) * 2
+
+        # Required number of lectures and practicals per subject
+        n_kinds = tables['lecture_match'].shape[0]
+        flat = rows[valid] * n_kinds + kind[valid]
+        kind_counts = np.bincount(flat, minlength=n_rows * n_kinds).reshape(n_rows, n_kinds)
+        lectures = (kind_counts @ tables['lecture_match']) * tables['lecture_multiplier']
+        penalty += np.abs(lectures - tables['required_lectures']).sum(axis=1) * 2
+        practicals = kind_counts @ tables['practical_match']
+        penalty += np.abs(practicals - tables['required_practicals']).sum(axis=1) * 2
+        return penalty
+
+    def evaluate(self, genomes):
+        if self._tables is None:
+            self._build_tables()
+        n_rows = len(genomes)
+        n_entities = max(self._tables['n_buckets'], len(self.lecturers), 1)
+        chunk = max(1, MAX_CELLS // (n_entities * WEEKS * self.slots_per_week))
+        penalties = [self._evaluate_chunk(genomes.rows(start, start + chunk)) for start in range(0, n_rows, chunk)]
+        return np.concatenate(penalties) if penalties else np.zeros(0, dtype=np.int64)
+
+    def fitness(self, genomes):
+        return 1 / (1 + self.evaluate(genomes))
@@ -0,0 +1,148 @@
+# Incremental rescheduling after a change of the input data.
+#
+# A ChangeSet lists what happened since a schedule was made: lecturers that are no longer
+# available, auditoriums that cannot be used and lessons that have to be added. reschedule()
+# applies it to the problem, keeps every lesson the change does not touch where it is, and
+# repairs only the affected ones: a displaced lesson first gets another lecturer or auditorium
+# in its old time slot, and is moved to another slot only if nothing fits there. The repaired
+# schedule can then be polished by a short warm-started GA run (see Config.initial_schedule).
+
+import copy
+import random
+from collections import Counter
+
+from .data import Registry
+from .ga import Result, solve
+from .operators import assign_randomly, get_possible_lecturers
+from .problem import Problem
+from .schedule import LESSON_FIELDS, LESSON_TYPES, TIME_SLOTS, WEEKS, Lesson, Schedule, is_conflict
+
+class ChangeSet:
+    def __init__(self, removed_lecturers=(), unavailable_auditoriums=(), extra_lessons=()):
+        self.removed_lecturers = list(removed_lecturers)  # Lecturer IDs
+        self.unavailable_auditoriums = list(unavailable_auditoriums)  # Auditorium IDs
+        # (subject ID, lesson type) pairs: the subject needs one more lesson of that type,
+        # practicals of subjects split into subgroups get one more lesson in every subgroup
+        self.extra_lessons = list(extra_lessons)
+
+def handles(table, names):
+    result = set()
+    for name in names:
+        handle = table.handle(name)
+        if handle is None:
+            raise ValueError(f"Unknown {table.kind} {name} in the change set")
+        result.add(handle)
+    return result
+
+def apply_changes(problem, changes):
+    # A new problem with the same handles, so schedules of the old one can be unpacked into it
+    subjects = [copy.copy(subject) for subject in problem.subjects]
+    for subject_id, lesson_type in changes.extra_lessons:
+        subject = subjects[next(iter(handles(problem.subjects, [subject_id])))]
+        if lesson_type == LESSON_TYPES[0]:
+            subject.num_lectures += 1
+        elif lesson_type == LESSON_TYPES[1]:
+            subject.num_practicals += 1
+        else:
+            raise ValueError(f"Unknown lesson type {lesson_type} in the change set")
+    registry = Registry([copy.copy(auditorium) for auditorium in problem.auditoriums],
+                        [copy.copy(group) for group in problem.groups],
+                        [copy.copy(lecturer) for lecturer in problem.lecturers],
+                        subjects)
+    return Problem(registry,
+                   problem.unavailable_lecturers | handles(problem.lecturers, changes.removed_lecturers),
+                   problem.unavailable_auditoriums | handles(problem.auditoriums, changes.unavailable_auditoriums))
+
+def place_in_slot(problem, lesson, time_slot, timetable):
+    # A copy of lesson with an available lecturer and auditorium that are free in time_slot, None if there is none.
+    # The current lecturer and auditorium are kept when possible.
+    lecturers = [lecturer.index for lecturer in get_possible_lecturers(problem, lesson)]
+    random.shuffle(lecturers)
+    if lesson.lecturer_index in lecturers:
+        lecturers.remove(lesson.lecturer_index)
+        lecturers.insert(0, lesson.lecturer_index)
+    auditoriums = [auditorium.index for auditorium in
+                   problem.auditorium_index.fitting(problem.students(lesson.group_index, lesson.subgroup))]
+    random.shuffle(auditoriums)
+    if lesson.auditorium_index in auditoriums:
+        auditoriums.remove(lesson.auditorium_index)
+        auditoriums.insert(0, lesson.auditorium_index)
+    for lecturer_index in lecturers:
+        for auditorium_index in auditoriums:
+            candidate = lesson.moved_to(time_slot)
+            candidate.lecturer_index = lecturer_index
+            candidate.auditorium_index = auditorium_index
+            if not is_conflict(candidate, time_slot, timetable):
+                return candidate
+    return None
+
+def place(schedule, week, lesson):
+    # Puts a lesson into its old slot if possible, otherwise into a random free slot of the same week,
+    # or of the other week when that one has none
+    problem = schedule.problem
+    if lesson.time_slot is not None:
+        candidate = place_in_slot(problem, lesson, lesson.time_slot, schedule.timetable(week))
+        if candidate is not None:
+            schedule.add_lesson(week, candidate.time_slot, candidate)
+            return True
+    lecturers = get_possible_lecturers(problem, lesson)
+    auditoriums = problem.auditorium_index.fitting(problem.students(lesson.group_index, lesson.subgroup))
+    if not lecturers or not auditoriums:
+        return False
+    lesson = Lesson(lesson.subject_index, lesson.type, lesson.group_index, lesson.subgroup)
+    lesson.lecturer_index = random.choice(lecturers).index
+    lesson.auditorium_index = random.choice(auditoriums).index
+    return assign_randomly(lesson, schedule, [week] + [other for other in WEEKS if other != week])
+
+def extra_lessons(problem, changes):
+    lessons = []
+    for subject_id, lesson_type in changes.extra_lessons:
+        subject = problem.subjects[problem.subjects.handle(subject_id)]
+        if subject.group_index is None:
+            continue
+        group = problem.groups[subject.group_index]
+        if lesson_type == LESSON_TYPES[1] and subject.requires_subgroups and group.subgroups:
+            lessons.extend(Lesson(subject.index, lesson_type, group.index, subgroup) for subgroup in group.subgroups)
+        else:
+            lessons.append(Lesson(subject.index, lesson_type, group.index))
+    return lessons
+
+def repair(problem, schedule, changes):
+    # schedule of the problem before the changes, problem from apply_changes(); returns the repaired schedule
+    repaired = Schedule.unpack(problem, schedule.pack())
+    displaced = []
+    for week in WEEKS:
+        timetable = repaired.timetable(week)
+        for time_slot in TIME_SLOTS:
+            for lesson in timetable[time_slot][:]:
+                if (lesson.lecturer_index in problem.unavailable_lecturers or
+                        lesson.auditorium_index in problem.unavailable_auditoriums):
+                    repaired.remove_lesson(week, time_slot, lesson)
+                    displaced.append((week, lesson))
+    for week, lesson in displaced:
+        place(repaired, week, lesson)
+    for lesson in extra_lessons(problem, changes):
+        # The week of the subject, a random one for subjects taught in both
+        week_type = problem.subjects[lesson.subject_index].week_type
+        place(repaired, week_type if week_type in WEEKS else random.choice(WEEKS), lesson)
+    repaired.update_fitness()
+    return repaired
+
+def reschedule(problem, schedule, changes, config=None):
+    # Repairs schedule after the changes; with a config the repaired schedule warm-starts a GA run
+    new_problem = apply_changes(problem, changes)
+    if config is not None and config.seed is not None:
+        random.seed(config.seed)
+    repaired = repair(new_problem, schedule, changes)
+    if config is None or not config.generations:
+        return Result(repaired, 0, stop_reason='generations', evaluations=1)
+    config = copy.copy(config)
+    config.initial_schedule = repaired
+    return solve(new_problem, config)
+
+def changed_lessons(before, after):
+    # Lessons of after that are not in before in the same week and slot with the same lecturer and auditorium
+    def lessons(schedule):
+        data = schedule.pack()
+        return Counter(tuple(data[i:i + LESSON_FIELDS]) for i in range(0, len(data), LESSON_FIELDS))
+    return sum((lessons(after) - lessons(before)).values())
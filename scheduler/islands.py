@@ -0,0 +1,151 @@
+# Island model for ga.genetic_algorithm.
+#
+# Every island evolves its own population in a separate process. Every migration_interval
+# generations an island sends copies of its best migration_size schedules (Schedule.pack()
+# encoding) to its neighbours in the topology and takes in whatever immigrants have arrived in
+# its inbox, replacing its worst schedules. Nobody waits for anybody: migration goes through
+# queues and is never a synchronization barrier. When one island finds a perfect schedule
+# the others stop at the end of their current generation.
+
+import copy
+import heapq
+import multiprocessing
+import queue
+import random
+import signal
+import time
+
+from .ga import Budget, Result, generation_step, initial_population, kept_best
+from .schedule import Schedule
+from .telemetry import Telemetry
+
+class IslandResult:
+    def __init__(self, island, data, fitness, generations, stop_reason, evaluations, cache_stats=None):
+        self.island = island
+        self.data = data  # Best schedule in the Schedule.pack() encoding
+        self.fitness = fitness
+        self.generations = generations
+        self.stop_reason = stop_reason  # As in ga.Result, 'stopped' if another island or the user ended the run
+        self.evaluations = evaluations
+        self.cache_stats = cache_stats  # FitnessCache.stats() of the island's process
+
+def neighbours(island, islands, topology):
+    if topology == 'ring':
+        return [(island + 1) % islands] if islands > 1 else []
+    if topology == 'full':
+        return [other for other in range(islands) if other != island]
+    raise ValueError(f"Unknown topology: {topology}")
+
+def migrate(problem, population, inbox, outboxes, migration_size):
+    for outbox in outboxes:
+        migrants = heapq.nlargest(migration_size, population, key=lambda x: x.fitness)
+        outbox.put([schedule.pack() for schedule in migrants])
+    immigrants = []
+    while True:
+        try:
+            immigrants.extend(inbox.get_nowait())
+        except queue.Empty:
+            break
+    if not immigrants:
+        return population
+    # Immigrants replace the worst schedules, the best one always stays
+    immigrants = [Schedule.unpack(problem, data) for data in immigrants[:len(population) - 1]]
+    for schedule in immigrants:
+        schedule.update_fitness()
+    population.sort(key=lambda x: x.fitness)
+    return immigrants + population[len(immigrants):]
+
+def run_island(island, seed, problem, config, started, inboxes, done, results):
+    # Ctrl+C is handled by the main process, which tells the islands to stop through done
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Leftover migrants must not keep a finished island from exiting
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+    outboxes = [inboxes[other] for other in neighbours(island, len(inboxes), config.topology)]
+    budget = Budget(config, len(inboxes), started)
+    cache = problem.use_fitness_cache(config.fitness_cache_bytes)
+    telemetry = Telemetry.open(config, island)
+    step = generation_step(config)
+    random.seed(f'{seed}:{island}')
+    population = initial_population(problem, config)
+    best_schedule = kept_best(config, max(population, key=lambda x: x.fitness))
+    budget.record(0, best_schedule.fitness, len(population))
+    generation = 0
+    if telemetry:
+        telemetry.write_population(0, budget, population, {'initialization': budget.generation_seconds})
+    while True:
+        stop_reason = 'stopped' if done.is_set() else budget.stop_reason(generation)
+        if stop_reason:
+            break
+        timings = {}
+        population = step(population, config, timings)
+        generation += 1
+        if generation % config.migration_interval == 0:
+            start = time.perf_counter()
+            population = migrate(problem, population, inboxes[island], outboxes, config.migration_size)
+            timings['migration'] = time.perf_counter() - start
+        best = max(population, key=lambda x: x.fitness)
+        if best.fitness > best_schedule.fitness:
+            best_schedule = kept_best(config, best)
+        budget.record(generation, best.fitness, budget.offspring)
+        if telemetry:
+            telemetry.write_population(generation, budget, population, timings)
+        if best.fitness == 1.0:
+            done.set()
+    if telemetry:
+        telemetry.close()
+    results.put(IslandResult(island, best_schedule.pack(), best_schedule.fitness, generation,
+                             stop_reason, budget.evaluations, cache.stats() if cache else None))
+
+def run_islands(problem, config):
+    if config.checkpoint_path:
+        raise ValueError("Checkpoints are not supported by the island model")
+    neighbours(0, config.islands, config.topology)  # Validate the topology before starting any process
+    started = time.monotonic()  # The time limit covers the start of the processes
+    seed = config.seed if config.seed is not None else random.getrandbits(64)
+    # The islands do not report single generations, and a progress callback may not be picklable
+    config = copy.copy(config)
+    config.progress = None
+    if config.telemetry_path:
+        open(config.telemetry_path, 'w').close()  # The islands append their records
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(config.islands)]
+    results = context.Queue()
+    done = context.Event()
+    processes = [
+        context.Process(target=run_island, args=(island, seed, problem, config, started, inboxes, done, results))
+        for island in range(config.islands)
+    ]
+    for process in processes:
+        process.start()
+    island_results = []
+    interrupted = False
+    while len(island_results) < config.islands:
+        try:
+            island_results.append(results.get(timeout=1))
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes) and results.empty():
+                raise RuntimeError("An island process exited without reporting its result")
+        except KeyboardInterrupt:
+            # The islands finish their current generation and report their best schedules
+            interrupted = True
+            done.set()
+    for process in processes:
+        process.join()
+    return sorted(island_results, key=lambda x: x.island), interrupted
+
+def genetic_algorithm(problem, config):
+    island_results, interrupted = run_islands(problem, config)
+    if config.verbose:
+        for result in island_results:
+            print(f'Island {result.island + 1}: Best Fitness = {result.fitness} after {result.generations} generations')
+    best = max(island_results, key=lambda x: x.fitness)
+    best_schedule = Schedule.unpack(problem, best.data, best.fitness)
+    if interrupted:
+        stop_reason = 'interrupted'
+    elif best.fitness == 1.0:
+        stop_reason = 'optimal'
+    else:
+        stop_reason = best.stop_reason
+    return Result(best_schedule, max(result.generations for result in island_results), island_results,
+                  stop_reason, sum(result.evaluations for result in island_results))
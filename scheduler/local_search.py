@@ -0,0 +1,130 @@
+# Memetic step: hill climbing on the best schedules of a generation.
+#
+# Each step picks a random neighbourhood and a random move in it, applies the move through
+# add_lesson/remove_lesson and keeps it only if the cached penalty went down (first
+# improvement). The penalty terms are updated incrementally, so trying a move costs about as
+# much as the move itself and calculate_fitness is never called. Moves that would create a
+# conflict are never applied.
+#
+# Neighbourhoods:
+#   move        - a lesson goes to another time slot of its week
+#   swap        - two lessons of a week exchange their time slots
+#   week        - a lesson goes to a time slot of the other week, which evens out weekly workloads
+#   lecturer    - a lesson gets another eligible lecturer
+#   auditorium  - a lesson gets another auditorium that fits its students
+
+import random
+
+from .operators import choose_auditorium, get_possible_lecturers
+from .schedule import TIME_SLOTS, WEEKS, is_conflict
+
+NEIGHBOURHOODS = ('move', 'swap', 'week', 'lecturer', 'auditorium')
+
+def replace(schedule, week, old_lessons, new_lessons):
+    # Swaps old_lessons for new_lessons (placed at their time_slot). Returns an undo function,
+    # or None and leaves the schedule unchanged if a new lesson conflicts.
+    for lesson in old_lessons:
+        schedule.remove_lesson(week, lesson.time_slot, lesson)
+    timetable = schedule.timetable(week)
+    added = []
+    for lesson in new_lessons:
+        if is_conflict(lesson, lesson.time_slot, timetable):
+            break
+        schedule.add_lesson(week, lesson.time_slot, lesson)
+        added.append(lesson)
+    else:
+        return lambda: restore(schedule, week, added, old_lessons)
+    restore(schedule, week, added, old_lessons)
+    return None
+
+def restore(schedule, week, added, old_lessons):
+    for lesson in added:
+        schedule.remove_lesson(week, lesson.time_slot, lesson)
+    for lesson in old_lessons:
+        schedule.add_lesson(week, lesson.time_slot, lesson)
+
+def random_lesson(schedule, week):
+    timetable = schedule.timetable(week)
+    occupied = [time_slot for time_slot in TIME_SLOTS if timetable[time_slot]]
+    if not occupied:
+        return None
+    return random.choice(timetable[random.choice(occupied)])
+
+def move(schedule, week, lesson):
+    time_slot = random.choice(TIME_SLOTS)
+    if time_slot == lesson.time_slot:
+        return None
+    return replace(schedule, week, [lesson], [lesson.moved_to(time_slot)])
+
+def swap(schedule, week, lesson):
+    other = random_lesson(schedule, week)
+    if other.time_slot == lesson.time_slot:
+        return None
+    return replace(schedule, week, [lesson, other], [lesson.moved_to(other.time_slot), other.moved_to(lesson.time_slot)])
+
+def change_week(schedule, week, lesson):
+    other_week = WEEKS[1 - WEEKS.index(week)]
+    moved = lesson.moved_to(random.choice(TIME_SLOTS))
+    if is_conflict(moved, moved.time_slot, schedule.timetable(other_week)):
+        return None
+    schedule.remove_lesson(week, lesson.time_slot, lesson)
+    schedule.add_lesson(other_week, moved.time_slot, moved)
+    def undo():
+        schedule.remove_lesson(other_week, moved.time_slot, moved)
+        schedule.add_lesson(week, lesson.time_slot, lesson)
+    return undo
+
+def change_lecturer(schedule, week, lesson):
+    lecturers = get_possible_lecturers(schedule.problem, lesson)
+    if len(lecturers) < 2:
+        return None
+    lecturer_index = random.choice(lecturers).index
+    if lecturer_index == lesson.lecturer_index:
+        return None
+    changed = lesson.moved_to(lesson.time_slot)
+    changed.lecturer_index = lecturer_index
+    return replace(schedule, week, [lesson], [changed])
+
+def change_auditorium(schedule, week, lesson):
+    problem = schedule.problem
+    auditorium = choose_auditorium(problem, problem.students(lesson.group_index, lesson.subgroup))
+    if auditorium is None or auditorium.index == lesson.auditorium_index:
+        return None
+    changed = lesson.moved_to(lesson.time_slot)
+    changed.auditorium_index = auditorium.index
+    return replace(schedule, week, [lesson], [changed])
+
+MOVES = {
+    'move': move,
+    'swap': swap,
+    'week': change_week,
+    'lecturer': change_lecturer,
+    'auditorium': change_auditorium,
+}
+
+def hill_climb(schedule, moves, neighbourhoods=None):
+    # Tries moves random moves, keeping the improving ones. Returns the number of kept moves.
+    neighbourhoods = [MOVES[name] for name in neighbourhoods or NEIGHBOURHOODS]
+    improvements = 0
+    for _ in range(moves):
+        if schedule.penalty == 0:
+            break
+        week = random.choice(WEEKS)
+        lesson = random_lesson(schedule, week)
+        if lesson is None:
+            continue
+        penalty = schedule.penalty
+        undo = random.choice(neighbourhoods)(schedule, week, lesson)
+        if undo is None:
+            continue
+        if schedule.penalty < penalty:
+            improvements += 1
+        else:
+            undo()
+    schedule.update_fitness()
+    return improvements
+
+def improve_population(population, config):
+    # Hill climbing on the config.memetic_individuals best schedules, in place
+    for schedule in sorted(population, key=lambda x: x.fitness, reverse=True)[:config.memetic_individuals]:
+        hill_climb(schedule, config.memetic_moves, config.memetic_neighbourhoods)
@@ -0,0 +1,347 @@
+# Genetic operators: initial population, selection, crossover and mutation
+import math
+import random
+import time
+
+from .schedule import TIME_SLOTS, WEEKS, Lesson, Schedule, is_conflict
+from .selection import REPLACEMENTS, SELECTIONS, fittest
+
+def get_possible_lecturers(problem, lesson):
+    # Matching lecturers by subject.id and lesson type (hard constraint), precomputed in Problem
+    return problem.eligible_lecturers[(lesson.subject_index, lesson.type)]
+
+def choose_auditorium(problem, students):
+    # Random auditorium with capacity >= students, None if none fits
+    index = problem.auditorium_index
+    start = index.first_fitting(students)
+    if start == len(index):
+        return None
+    return index.auditoriums[random.randrange(start, len(index))]
+
+def evaluate_population(population, batch=True):
+    # Calculate fitness for many schedules at once; schedules seen before are taken from the problem's fitness cache
+    cache = population[0].problem.fitness_cache if population else None
+    if cache is not None:
+        unknown = []
+        for schedule in population:
+            entry = cache.get(schedule)
+            if entry is None:
+                unknown.append(schedule)
+            else:
+                schedule.fitness = entry[0]
+        population = unknown
+    codec = population[0].problem.codec() if batch and population else None
+    if codec is not None:
+        for schedule, fitness in zip(population, codec.fitness(codec.encode(population))):
+            schedule.fitness = float(fitness)
+    else:
+        for schedule in population:
+            schedule.update_fitness()
+    if cache is not None:
+        for schedule in population:
+            cache.put(schedule)
+
+def required_lessons(problem):
+    # New unplaced lessons that a complete schedule has to contain
+    groups = problem.groups
+    lessons = []
+    for subject in problem.subjects:
+        if subject.group_index is None:
+            continue
+        group = groups[subject.group_index]
+        # Lectures
+        for _ in range(subject.num_lectures):
+            lessons.append(Lesson(subject.index, 'Лекція', group.index))
+        # Practicals
+        if subject.requires_subgroups and group.subgroups:
+            num_practicals_per_subgroup = math.ceil(subject.num_practicals / len(group.subgroups))
+            for subgroup in group.subgroups:
+                for _ in range(num_practicals_per_subgroup):
+                    lessons.append(Lesson(subject.index, 'Практика', group.index, subgroup))
+        else:
+            for _ in range(subject.num_practicals):
+                lessons.append(Lesson(subject.index, 'Практика', group.index))
+    return lessons
+
+def random_schedule(problem):
+    schedule = Schedule(problem)
+    lessons_to_schedule = required_lessons(problem)
+    # Randomize the order of lessons
+    random.shuffle(lessons_to_schedule)
+    # Assign lessons
+    for lesson in lessons_to_schedule:
+        possible_lecturers = get_possible_lecturers(problem, lesson)
+        if not possible_lecturers:
+            continue
+        lesson.lecturer_index = random.choice(possible_lecturers).index
+        auditorium = choose_auditorium(problem, problem.students(lesson.group_index, lesson.subgroup))
+        if auditorium is None:
+            continue
+        lesson.auditorium_index = auditorium.index
+        # Lessons that do not fit anywhere are left out and show up in the subject penalties
+        assign_randomly(lesson, schedule)
+    return schedule
+
+def schedule_builder(initialization):
+    # Function building one new schedule of a problem; schedules share no state, so they can be built anywhere
+    if initialization == 'greedy':
+        from .construct import greedy_schedule
+        return greedy_schedule
+    if initialization == 'random':
+        return random_schedule
+    raise ValueError(f"Unknown initialization: {initialization}")
+
+def create_initial_population(problem, config):
+    build = schedule_builder(config.initialization)
+    population = [build(problem) for _ in range(config.population_size)]
+    evaluate_population(population, config.batch_fitness)
+    return population
+
+def warm_start_population(schedule, config):
+    # The schedule itself and perturbed copies of it
+    population = [schedule.clone()]
+    while len(population) < config.population_size:
+        child = schedule.clone()
+        for _ in range(config.warm_start_mutations):
+            mutate(child, evaluate=False)
+        population.append(child)
+    evaluate_population(population, config.batch_fitness)
+    return population
+
+def assign_randomly(lesson, schedule, weeks=WEEKS):
+    # Puts the lesson into a random free slot of the first of weeks that has one
+    assigned = False
+    for week in weeks:
+        available_time_slots = TIME_SLOTS.copy()
+        random.shuffle(available_time_slots)
+        for time_slot in available_time_slots:
+            if not is_conflict(lesson, time_slot, schedule.timetable(week)):
+                lesson.time_slot = time_slot
+                schedule.add_lesson(week, time_slot, lesson)
+                assigned = True
+                break
+        if assigned:
+            break
+    return assigned
+
+def selection(population, config):
+    # The mating pool, see selection.py; the population itself is left as it is
+    return SELECTIONS[config.selection](population, config)
+
+def crossover(parent1, parent2, evaluate=True, child=None):
+    # child, if given, is a schedule that is no longer used and is reset to hold the new one
+    if child is None:
+        child = Schedule(parent1.problem)
+    else:
+        child.reset()
+    for time_slot in TIME_SLOTS:
+        # Decide whether to copy lessons from parent1 or parent2
+        if random.random() < 0.5:
+            source_even = parent1.even_timetable
+            source_odd = parent1.odd_timetable
+        else:
+            source_even = parent2.even_timetable
+            source_odd = parent2.odd_timetable
+        # Copy lessons for even and odd week
+        child.inherit_slot('even', time_slot, source_even)
+        child.inherit_slot('odd', time_slot, source_odd)
+    # Calculate fitness after crossover
+    if evaluate:
+        child.update_fitness()
+    return child
+
+def mutate(schedule, evaluate=True):
+    # Randomly change some lessons in the schedule
+    mutation_rate = 0.1  # 10% chance of mutation
+    for week in WEEKS:
+        timetable = schedule.timetable(week)
+        opposite_week = 'odd' if week == 'even' else 'even'
+        # Chance to transfer lessons between weeks
+        if random.random() < mutation_rate:
+            transfer_lesson_between_weeks(schedule, week, opposite_week)
+        # Chance to add a new lesson
+        if random.random() < mutation_rate:
+            add_random_lesson(schedule, week)
+        # Chance to remove an existing lesson
+        if random.random() < mutation_rate:
+            remove_random_lesson(schedule, week)
+        for time_slot in TIME_SLOTS:
+            if timetable[time_slot]:
+                for lesson in timetable[time_slot][:]:
+                    if random.random() < mutation_rate:
+                        original_time_slot = lesson.time_slot
+                        new_time_slot = random.choice(TIME_SLOTS)
+                        if new_time_slot == original_time_slot:
+                            continue
+                        if not is_conflict(lesson, new_time_slot, timetable):
+                            schedule.move_lesson(week, lesson, new_time_slot)
+    # Only the days touched by the moves were re-scored
+    if evaluate:
+        schedule.update_fitness()
+
+def transfer_lesson_between_weeks(schedule, from_week, to_week):
+    from_timetable = schedule.timetable(from_week)
+    to_timetable = schedule.timetable(to_week)
+    # Choose a random time slot and lesson
+    time_slots_with_lessons = [ts for ts in from_timetable if from_timetable[ts]]
+    if not time_slots_with_lessons:
+        return
+    time_slot = random.choice(time_slots_with_lessons)
+    lessons_to_transfer = from_timetable[time_slot][:]
+    # Check if lessons can be transferred without conflicts
+    can_transfer = True
+    for lesson in lessons_to_transfer:
+        if is_conflict(lesson, time_slot, to_timetable):
+            can_transfer = False
+            break
+    if can_transfer:
+        # Transfer lessons
+        for lesson in lessons_to_transfer:
+            schedule.remove_lesson(from_week, time_slot, lesson)
+            schedule.add_lesson(to_week, time_slot, lesson)
+
+def add_random_lesson(schedule, week):
+    problem = schedule.problem
+    groups = problem.groups
+    timetable = schedule.timetable(week)
+    # Choose a random subject
+    subject = random.choice(problem.subjects)
+    if subject.group_index is None:
+        return
+    group = groups[subject.group_index]
+    # Choose a random lesson type
+    lesson_type = random.choice(['Лекція', 'Практика'])
+    lessons_to_add = []
+    if lesson_type == 'Практика' and subject.requires_subgroups and group.subgroups:
+        for subgroup in group.subgroups:
+            lesson = Lesson(subject.index, lesson_type, group.index, subgroup)
+            lessons_to_add.append(lesson)
+    else:
+        lesson = Lesson(subject.index, lesson_type, group.index)
+        lessons_to_add.append(lesson)
+    # Assign lecturer and auditorium
+    for lesson in lessons_to_add:
+        possible_lecturers = get_possible_lecturers(problem, lesson)
+        if not possible_lecturers:
+            return
+        lecturer = random.choice(possible_lecturers)
+        lesson.lecturer_index = lecturer.index
+        auditorium = choose_auditorium(problem, problem.students(lesson.group_index, lesson.subgroup))
+        if auditorium is None:
+            return
+        lesson.auditorium_index = auditorium.index
+    # Assign time slot
+    available_time_slots = TIME_SLOTS.copy()
+    random.shuffle(available_time_slots)
+    for time_slot in available_time_slots:
+        conflict = False
+        for lesson in lessons_to_add:
+            if is_conflict(lesson, time_slot, timetable):
+                conflict = True
+                break
+        if not conflict:
+            for lesson in lessons_to_add:
+                lesson.time_slot = time_slot
+                schedule.add_lesson(week, time_slot, lesson)
+            break
+
+def remove_random_lesson(schedule, week):
+    timetable = schedule.timetable(week)
+    # Choose a random lesson to remove
+    all_lessons = [lesson for lessons in timetable.values() for lesson in lessons]
+    if not all_lessons:
+        return
+    lesson_to_remove = random.choice(all_lessons)
+    # If it's a lesson with subgroups, remove all related lessons
+    lessons_to_remove = []
+    if lesson_to_remove.subgroup:
+        for lessons in timetable.values():
+            for lesson in lessons:
+                if (lesson.subject_index == lesson_to_remove.subject_index and
+                    lesson.group_index == lesson_to_remove.group_index and
+                    lesson.type == lesson_to_remove.type and
+                    lesson.subgroup == lesson_to_remove.subgroup):
+                    lessons_to_remove.append(lesson)
+    else:
+        lessons_to_remove.append(lesson_to_remove)
+    for lesson in lessons_to_remove:
+        schedule.remove_lesson(week, lesson.time_slot, lesson)
+
+def elite_count(population_size):
+    # Elitism: the top 10% individuals are retained without changes
+    return max(1, int(0.1 * population_size))
+
+def next_generation(population, config, timings=None):
+    # timings, if given, receives the seconds spent in every phase (see telemetry.py)
+    clock = time.perf_counter
+    start = clock()
+    selected = selection(population, config)
+    new_population = [elite.clone() for elite in fittest(population, elite_count(config.population_size))]
+    phases = {'selection': clock() - start, 'crossover': 0.0, 'mutation': 0.0}
+    # Random crossover and mutation for the rest
+    children = []
+    while len(new_population) + len(children) < config.population_size:
+        start = clock()
+        parent1, parent2 = random.sample(selected, 2)
+        child = crossover(parent1, parent2, evaluate=False)
+        crossed = clock()
+        mutate(child, evaluate=False)
+        phases['crossover'] += crossed - start
+        phases['mutation'] += clock() - crossed
+        children.append(child)
+    start = clock()
+    evaluate_population(children, config.batch_fitness)
+    phases['evaluation'] = clock() - start
+    new_population.extend(children)
+    if config.memetic_individuals:
+        from .local_search import improve_population
+        start = clock()
+        improve_population(new_population, config)
+        phases['local_search'] = clock() - start
+    if timings is not None:
+        timings.update(phases)
+    return new_population
+
+def steady_state_generation(population, config, timings=None):
+    # As many children as next_generation makes, config.steady_state at a time. Every batch of
+    # children takes the places chosen by config.replacement in the population list itself, so the
+    # next batch already breeds from them. A replaced schedule lends its storage to the child
+    # unless it is a parent in the batch; callers keep their best schedule as a clone (ga.kept_best).
+    clock = time.perf_counter
+    phases = {'selection': 0.0, 'crossover': 0.0, 'mutation': 0.0, 'evaluation': 0.0}
+    replace = REPLACEMENTS[config.replacement]
+    remaining = config.population_size - elite_count(config.population_size)
+    while remaining > 0:
+        start = clock()
+        selected = selection(population, config)
+        places = replace(population, min(config.steady_state, remaining), config)
+        pairs = [random.sample(selected, 2) for _ in places]
+        parents = {id(parent) for pair in pairs for parent in pair}
+        phases['selection'] += clock() - start
+        children = []
+        for place, (parent1, parent2) in zip(places, pairs):
+            start = clock()
+            replaced = population[place]
+            child = crossover(parent1, parent2, evaluate=False, child=None if id(replaced) in parents else replaced)
+            crossed = clock()
+            mutate(child, evaluate=False)
+            phases['crossover'] += crossed - start
+            phases['mutation'] += clock() - crossed
+            children.append(child)
+        # Batches this small are cheaper to score from the children's own penalty terms than with NumPy
+        start = clock()
+        evaluate_population(children, batch=False)
+        phases['evaluation'] += clock() - start
+        for place, child in zip(places, children):
+            population[place] = child
+        remaining -= len(children)
+        if not children:
+            break  # A population of one schedule has nothing to replace
+    if config.memetic_individuals:
+        from .local_search import improve_population
+        start = clock()
+        improve_population(population, config)
+        phases['local_search'] = clock() - start
+    if timings is not None:
+        timings.update(phases)
+    return population
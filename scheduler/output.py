@@ -0,0 +1,188 @@
+# Printing and exporting schedules.
+#
+# The exporters stream one lesson at a time straight to the file, in linear time and constant
+# memory: CSV, JSON Lines and iCalendar. Every format can be limited to the lessons of one
+# group, lecturer or auditorium (a view). The grid printed with tabulate is meant for people and
+# small schedules; write_json is the format read back by read_json.
+import csv
+import json
+import math
+from datetime import datetime, time, timedelta, timezone
+
+from .schedule import DAYS, LESSON_TYPES, TIME_SLOTS, WEEKS, Lesson, Schedule
+
+RECORD_FIELDS = ['week', 'day', 'period', 'group', 'subgroup', 'subject_id', 'subject', 'type',
+                 'lecturer_id', 'lecturer', 'auditorium', 'students', 'capacity']
+# View -> table of the entity and the lesson attribute with its handle
+VIEWS = {
+    'group': ('groups', 'group_index'),
+    'lecturer': ('lecturers', 'lecturer_index'),
+    'auditorium': ('auditoriums', 'auditorium_index'),
+}
+PERIOD_TIMES = {  # Start and end of every period, for iCalendar
+    '1': (time(8, 40), time(10, 15)),
+    '2': (time(10, 35), time(12, 10)),
+    '3': (time(12, 20), time(13, 55)),
+    '4': (time(14, 5), time(15, 40)),
+}
+
+def lesson_record(problem, week, time_slot, lesson):
+    # A lesson with its handles resolved to the identifiers from the input files
+    group = problem.groups[lesson.group_index]
+    lecturer = problem.lecturers[lesson.lecturer_index] if lesson.lecturer_index is not None else None
+    auditorium = problem.auditoriums[lesson.auditorium_index] if lesson.auditorium_index is not None else None
+    return {
+        'week': week,
+        'day': time_slot[0],
+        'period': time_slot[1],
+        'group': group.number,
+        'subgroup': lesson.subgroup,
+        'subject_id': problem.subjects[lesson.subject_index].id,
+        'subject': problem.subjects[lesson.subject_index].name,
+        'type': lesson.type,
+        'lecturer_id': lecturer.id if lecturer else None,
+        'lecturer': lecturer.name if lecturer else None,
+        'auditorium': auditorium.id if auditorium else None,
+        'students': problem.students(lesson.group_index, lesson.subgroup),
+        'capacity': auditorium.capacity if auditorium else None,
+    }
+
+def lesson_records(schedule, view=None, name=None):
+    # Records of all lessons in week and time slot order, or only those of the entity name of a view
+    problem = schedule.problem
+    attribute = handle = None
+    if view is not None:
+        table_name, attribute = VIEWS[view]
+        handle = resolve(getattr(problem, table_name), name)
+    for week in WEEKS:
+        timetable = schedule.timetable(week)
+        for time_slot in TIME_SLOTS:
+            for lesson in timetable[time_slot]:
+                if attribute is None or getattr(lesson, attribute) == handle:
+                    yield lesson_record(problem, week, time_slot, lesson)
+
+def print_schedule(schedule, view=None, name=None, file=None):
+    from tabulate import tabulate  # Only the grid needs it
+    headers = [
+        'Timeslot',
+        'Group(s)',
+        'Subject',
+        'Type',
+        'Lecturer',
+        'Auditorium',
+        'Students',
+        'Capacity'
+    ]
+    tables = {week: [] for week in WEEKS}
+    for record in lesson_records(schedule, view, name):
+        group_str = record['group']
+        if record['subgroup']:
+            group_str += f" (Subgroup {record['subgroup']})"
+        tables[record['week']].append([
+            f"{record['day']}, period {record['period']}",
+            group_str,
+            record['subject'],
+            record['type'],
+            record['lecturer'] or "N/A",
+            record['auditorium'] or "N/A",
+            str(record['students']),
+            str(record['capacity']) if record['capacity'] is not None else "N/A"
+        ])
+
+    for week in WEEKS:
+        print(f"\nBest schedule - {week.upper()} week:\n", file=file)
+        if tables[week]:
+            print(tabulate(tables[week], headers=headers, tablefmt="grid", stralign="center"), file=file)
+        else:
+            print(f"No lessons scheduled for {week.upper()} week.\n", file=file)
+
+def write_json(schedule, file):
+    json.dump({'fitness': schedule.fitness, 'lessons': list(lesson_records(schedule))},
+              file, ensure_ascii=False, indent=2)
+    file.write('\n')
+
+def write_csv(schedule, file, view=None, name=None):
+    writer = csv.DictWriter(file, RECORD_FIELDS)
+    writer.writeheader()
+    for record in lesson_records(schedule, view, name):
+        writer.writerow(record)
+
+def write_jsonl(schedule, file, view=None, name=None):
+    for record in lesson_records(schedule, view, name):
+        file.write(json.dumps(record, ensure_ascii=False))
+        file.write('\n')
+
+def ical_text(value):
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def ical_line(file, line):
+    # Content lines are folded at 75 octets, continuation lines start with a space
+    data = line.encode('utf-8')
+    while len(data) > 75:
+        cut = 75
+        while data[cut] & 0xC0 == 0x80:  # Inside a UTF-8 sequence
+            cut -= 1
+        file.write(data[:cut].decode('utf-8') + '\r\n')
+        data = b' ' + data[cut:]
+    file.write(data.decode('utf-8') + '\r\n')
+
+def write_ical(schedule, file, term_start, term_weeks=16, view=None, name=None, stamp=None):
+    # Every lesson becomes an event repeated every other week of the term. term_start is the
+    # Monday of the first week of the term, which is WEEKS[0]; times are local (floating).
+    if term_start.weekday() != 0:
+        raise ValueError(f"The term must start on a Monday, not on {term_start:%A} {term_start}")
+    if term_weeks < 1:
+        raise ValueError(f"The term must last at least one week, not {term_weeks}")
+    stamp = (stamp or datetime.now(timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+    ical_line(file, 'BEGIN:VCALENDAR')
+    ical_line(file, 'VERSION:2.0')
+    ical_line(file, 'PRODID:-//scheduler//timetable//UK')
+    ical_line(file, 'CALSCALE:GREGORIAN')
+    if view is not None:
+        ical_line(file, f'X-WR-CALNAME:{ical_text(name)}')
+    # Event UIDs name the exported calendar (view and owner) and the lesson (week, slot, group,
+    # subject, type), so exports of different views can be imported side by side
+    owner = f'{view}-{name}' if view is not None else 'all'
+    for record in lesson_records(schedule, view, name):
+        week = WEEKS.index(record['week'])
+        if week >= term_weeks:
+            continue  # An odd-week lesson in a term of one week never takes place
+        day = term_start + timedelta(days=7 * week + DAYS.index(record['day']))
+        start, end = PERIOD_TIMES[record['period']]
+        group = record['group'] + (f" ({record['subgroup']})" if record['subgroup'] else '')
+        ical_line(file, 'BEGIN:VEVENT')
+        lesson = (record['week'], record['day'], record['period'], record['group'], record['subgroup'] or '',
+                  record['subject_id'], LESSON_TYPES.index(record['type']))
+        ical_line(file, f"UID:{ical_text('-'.join(map(str, lesson)))}@{ical_text(owner)}.scheduler")
+        ical_line(file, f'DTSTAMP:{stamp}')
+        ical_line(file, f'DTSTART:{datetime.combine(day, start):%Y%m%dT%H%M%S}')
+        ical_line(file, f'DTEND:{datetime.combine(day, end):%Y%m%dT%H%M%S}')
+        ical_line(file, f'RRULE:FREQ=WEEKLY;INTERVAL={len(WEEKS)};COUNT={math.ceil((term_weeks - week) / len(WEEKS))}')
+        ical_line(file, f"SUMMARY:{ical_text(record['subject'])} ({ical_text(record['type'])})")
+        if record['auditorium']:
+            ical_line(file, f"LOCATION:{ical_text(record['auditorium'])}")
+        ical_line(file, f"DESCRIPTION:{ical_text(group)}\\n{ical_text(record['lecturer'] or 'N/A')}")
+        ical_line(file, 'END:VEVENT')
+    ical_line(file, 'END:VCALENDAR')
+
+def resolve(table, name):
+    # Handle of an identifier from an exported schedule, None stays None
+    if name is None:
+        return None
+    handle = table.handle(name)
+    if handle is None:
+        raise ValueError(f"Unknown {table.kind} {name} in the schedule")
+    return handle
+
+def read_json(problem, file):
+    # Schedule written by write_json, with the identifiers resolved to the handles of problem
+    schedule = Schedule(problem)
+    for record in json.load(file)['lessons']:
+        lesson = Lesson(resolve(problem.subjects, record['subject_id']), record['type'],
+                        resolve(problem.groups, record['group']), record['subgroup'])
+        lesson.time_slot = (record['day'], record['period'])
+        lesson.lecturer_index = resolve(problem.lecturers, record['lecturer_id'])
+        lesson.auditorium_index = resolve(problem.auditoriums, record['auditorium'])
+        schedule.add_lesson(record['week'], lesson.time_slot, lesson)
+    schedule.update_fitness()
+    return schedule
@@ -0,0 +1,219 @@
+# Parallel offspring production and evaluation for ga.genetic_algorithm.
+#
+# The problem is shipped once to every worker by the pool initializer. Each generation the
+# selected parents are written once, in the compact Schedule.pack() encoding, to a shared memory
+# block (ParentBlock) that the tasks only name. A worker unpacks a parent when one of its tasks
+# first samples it and keeps it for its later tasks of the generation. The workers run crossover,
+# mutation and fitness evaluation and send back packed children with their fitness. The initial
+# population is built by the workers the same way, CHILDREN_PER_TASK schedules per task. Tasks
+# have a fixed size and every task seeds its own random stream from (seed, generation, task), so
+# a run is reproducible for a given seed whatever the number of workers.
+
+import os
+import random
+import signal
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+from .ga import Budget, Result, initial_population, load_checkpoint, report_generation, save_checkpoint
+from .operators import crossover, elite_count, evaluate_population, mutate, schedule_builder, selection
+from .selection import fittest
+from .local_search import hill_climb
+from .schedule import Schedule
+from .telemetry import Telemetry
+
+CHILDREN_PER_TASK = 8  # Smaller tasks balance the load better, larger ones ship the parents less often
+
+worker_problem = None  # The problem in a worker process, set by init_worker
+worker_batch_fitness = True
+worker_parents = None  # SharedParents of the generation the worker is breeding
+
+class PackedSchedule:
+    # A schedule in the Schedule.pack() encoding together with its fitness
+    def __init__(self, data, fitness):
+        self.data = data
+        self.fitness = fitness
+
+def pack(schedule):
+    return PackedSchedule(schedule.pack(), schedule.fitness)
+
+def unpack(problem, packed):
+    return Schedule.unpack(problem, packed.data, packed.fitness)
+
+def split(total, size):
+    # Chunks of at most size items that add up to total
+    return [min(size, total - start) for start in range(0, total, size)]
+
+def improve_packed(problem, population, config):
+    # The memetic step runs here on the best schedules of the whole generation, see local_search.py
+    best = sorted(range(len(population)), key=lambda i: population[i].fitness, reverse=True)
+    for i in best[:config.memetic_individuals]:
+        schedule = unpack(problem, population[i])
+        hill_climb(schedule, config.memetic_moves, config.memetic_neighbourhoods)
+        population[i] = pack(schedule)
+
+class ParentBlock:
+    # The packed parents of one generation in shared memory, written by the main process
+    def __init__(self, parents):
+        self.offsets = [0]
+        for data in parents:
+            self.offsets.append(self.offsets[-1] + len(data) * data.itemsize)
+        self.memory = shared_memory.SharedMemory(create=True, size=max(self.offsets[-1], 1))
+        for data, start in zip(parents, self.offsets):
+            self.memory.buf[start:start + len(data) * data.itemsize] = data.tobytes()
+        self.name = self.memory.name
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+class SharedParents:
+    # A worker's view of a ParentBlock: parents are unpacked on first use
+    def __init__(self, name, offsets):
+        self.memory = shared_memory.SharedMemory(name=name)
+        self.name = name
+        self.offsets = offsets
+        self.schedules = {}
+
+    def __getitem__(self, position):
+        schedule = self.schedules.get(position)
+        if schedule is None:
+            data = array('i')
+            data.frombytes(self.memory.buf[self.offsets[position]:self.offsets[position + 1]])
+            schedule = self.schedules[position] = Schedule.unpack(worker_problem, data)
+        return schedule
+
+    def close(self):
+        self.schedules = {}
+        self.memory.close()
+
+def generation_parents(name, offsets):
+    global worker_parents
+    if worker_parents is None or worker_parents.name != name:
+        if worker_parents is not None:
+            worker_parents.close()
+        worker_parents = SharedParents(name, offsets)
+    return worker_parents
+
+def init_worker(problem, batch_fitness, fitness_cache_bytes=0):
+    global worker_problem, worker_batch_fitness
+    # Ctrl+C is handled by the main process, which stops after the current generation
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_problem = problem
+    worker_problem.use_fitness_cache(fitness_cache_bytes)
+    worker_batch_fitness = batch_fitness
+
+def build_schedules(task):
+    stream, initialization, count = task
+    random.seed(stream)
+    build = schedule_builder(initialization)
+    schedules = [build(worker_problem) for _ in range(count)]
+    evaluate_population(schedules, worker_batch_fitness)
+    return [(schedule.pack(), schedule.fitness) for schedule in schedules]
+
+def build_initial_population(executor, problem, config, base_seed):
+    # New schedules are independent of each other and built by the workers; a warm start stays here
+    if config.initial_schedule is not None:
+        return [pack(schedule) for schedule in initial_population(problem, config)]
+    counts = split(config.population_size, CHILDREN_PER_TASK)
+    tasks = [(f'{base_seed}:init:{task}', config.initialization, count) for task, count in enumerate(counts)]
+    return [PackedSchedule(data, fitness) for schedules in executor.map(build_schedules, tasks)
+            for data, fitness in schedules]
+
+def produce_children(task):
+    # pool: positions in the generation's ParentBlock of the schedules in the mating pool
+    stream, name, offsets, pool, count = task
+    random.seed(stream)
+    parents = generation_parents(name, offsets)
+    children = []
+    for _ in range(count):
+        first, second = random.sample(pool, 2)
+        child = crossover(parents[first], parents[second], evaluate=False)
+        mutate(child, evaluate=False)
+        children.append(child)
+    evaluate_population(children, worker_batch_fitness)
+    return [(child.pack(), child.fitness) for child in children]
+
+def genetic_algorithm(problem, config):
+    if config.steady_state:
+        raise ValueError("Steady-state replacement needs the whole population in one process, not workers")
+    budget = Budget(config)
+    telemetry = Telemetry.open(config)
+    state = load_checkpoint(problem, config)
+    if os.name == 'posix':
+        # Workers share the main process's tracker, which forgets a ParentBlock once it is unlinked
+        resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=config.workers, initializer=init_worker,
+                             initargs=(problem, config.batch_fitness, config.fitness_cache_bytes)) as executor:
+        if state:
+            random.setstate(state.rng_state)
+            base_seed = state.base_seed
+            population = [PackedSchedule(data, fitness) for data, fitness in state.population]
+            best_schedule = PackedSchedule(*state.best)
+            budget.restore(state)
+            generation = state.generation
+        else:
+            if config.seed is not None:
+                random.seed(config.seed)
+            base_seed = random.getrandbits(64)
+            population = build_initial_population(executor, problem, config, base_seed)
+            best_schedule = max(population, key=lambda x: x.fitness)
+            budget.record(0, best_schedule.fitness, len(population))
+            generation = 0
+            if telemetry:
+                telemetry.write_packed(0, budget, population, problem, {'initialization': budget.generation_seconds})
+
+        def save():
+            save_checkpoint(problem, config, generation, budget,
+                            [(schedule.data, schedule.fitness) for schedule in population],
+                            (best_schedule.data, best_schedule.fitness), base_seed)
+
+        try:
+            while True:
+                stop_reason = budget.stop_reason(generation)
+                if stop_reason:
+                    break
+                start = time.perf_counter()
+                selected = selection(population, config)
+                # Elitism: packed schedules are never modified, so the elites are kept as they are
+                new_population = fittest(population, elite_count(config.population_size))
+                # Tournament and SUS pools repeat schedules: each one is shipped and unpacked once
+                positions = {}
+                pool = [positions.setdefault(id(schedule), len(positions)) for schedule in selected]
+                unique = {id(schedule): schedule for schedule in selected}
+                block = ParentBlock([schedule.data for schedule in unique.values()])
+                counts = split(config.population_size - len(new_population), CHILDREN_PER_TASK)
+                tasks = [(f'{base_seed}:{generation}:{task}', block.name, block.offsets, pool, count)
+                         for task, count in enumerate(counts)]
+                selected_at = time.perf_counter()
+                try:
+                    for children in executor.map(produce_children, tasks):
+                        new_population.extend(PackedSchedule(data, fitness) for data, fitness in children)
+                finally:
+                    block.close()
+                timings = {'selection': selected_at - start, 'offspring': time.perf_counter() - selected_at}
+                if config.memetic_individuals:
+                    start = time.perf_counter()
+                    improve_packed(problem, new_population, config)
+                    timings['local_search'] = time.perf_counter() - start
+                population = new_population
+                best = max(population, key=lambda x: x.fitness)
+                if best.fitness > best_schedule.fitness:
+                    best_schedule = best
+                budget.record(generation + 1, best.fitness, budget.offspring)
+                report_generation(config, generation, best.fitness)
+                generation += 1
+                if telemetry:
+                    telemetry.write_packed(generation, budget, population, problem, timings)
+                if config.checkpoint_path and generation % config.checkpoint_interval == 0:
+                    save()
+        except KeyboardInterrupt:
+            stop_reason = 'interrupted'
+        finally:
+            if telemetry:
+                telemetry.close()
+    if config.checkpoint_path and stop_reason != 'interrupted':
+        save()
+    return Result(unpack(problem, best_schedule), generation, stop_reason=stop_reason, evaluations=budget.evaluations)
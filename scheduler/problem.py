@@ -0,0 +1,133 @@
+# The scheduling problem: reference data and the lookups derived from it
+import os
+from bisect import bisect_left
+
+from .cache import FitnessCache
+from .data import load_registry
+from .schedule import DAYS, LESSON_TYPES, PERIODS
+try:
+    from . import genome  # Batched NumPy fitness evaluation
+except ImportError:  # NumPy is not installed
+    genome = None
+
+INPUT_FILES = {
+    'auditoriums': 'auditoriums.csv',
+    'groups': 'groups.csv',
+    'lecturers': 'lecturers.csv',
+    'subjects': 'subjects.csv',
+}
+
+class AuditoriumIndex:
+    # Auditoriums sorted by capacity: the rooms that fit n students are a suffix found by bisection
+    def __init__(self, auditoriums):
+        self.auditoriums = sorted(auditoriums, key=lambda x: x.capacity)  # Stable, ties keep the file order
+        self.capacities = [auditorium.capacity for auditorium in self.auditoriums]
+
+    def __len__(self):
+        return len(self.auditoriums)
+
+    def first_fitting(self, students):
+        # Position of the smallest auditorium with capacity >= students, len(self) if none fits
+        return bisect_left(self.capacities, students)
+
+    def fitting(self, students):
+        return self.auditoriums[self.first_fitting(students):]
+
+class Problem:
+    def __init__(self, registry, unavailable_lecturers=(), unavailable_auditoriums=()):
+        self.registry = registry
+        # Handles of entities that stay in the tables but must not be assigned to lessons
+        self.unavailable_lecturers = frozenset(unavailable_lecturers)
+        self.unavailable_auditoriums = frozenset(unavailable_auditoriums)
+        self.auditoriums = registry.auditoriums
+        self.groups = registry.groups
+        self.lecturers = registry.lecturers
+        self.subjects = registry.subjects
+        self.report = registry.report  # data.LoadReport of the input files, including the cross-reference checks
+        self.warnings = list(registry.warnings)
+        # Eligibility indexes used by the genetic operators, built in one pass over the lecturers
+        teachers = {}  # subject ID -> lecturers that list it, in file order
+        for lecturer in self.lecturers:
+            for subject_id in lecturer.subjects_can_teach:
+                lecturers = teachers.setdefault(subject_id, [])
+                if not lecturers or lecturers[-1] is not lecturer:
+                    lecturers.append(lecturer)
+        self.eligible_lecturers = {}  # (subject handle, lesson type) -> lecturers allowed to teach it
+        for subject in self.subjects:
+            for lesson_type in LESSON_TYPES:
+                self.eligible_lecturers[(subject.index, lesson_type)] = [
+                    lecturer for lecturer in teachers.get(subject.id, ())
+                    if lesson_type in lecturer.types_can_teach and lecturer.index not in self.unavailable_lecturers]
+        for subject in self.subjects:
+            if subject.group_index is None or subject.id not in teachers:
+                continue  # Reported by the registry
+            for lesson_type, count in zip(LESSON_TYPES, (subject.num_lectures, subject.num_practicals)):
+                if count and not self.eligible_lecturers[(subject.index, lesson_type)]:
+                    self.warnings.append(f"No lecturer available for {subject.name} ({lesson_type}) with subject ID {subject.id}")
+        self.auditorium_index = AuditoriumIndex([auditorium for auditorium in self.auditoriums
+                                                 if auditorium.index not in self.unavailable_auditoriums])
+        # Lookups for incremental fitness evaluation
+        self.gap_buckets = set((group.index, subgroup) for group in self.groups
+                               for subgroup in (group.subgroups if group.subgroups else [None]))
+        self.lecturer_max_hours = [lecturer.max_hours_per_week for lecturer in self.lecturers]
+        self.subject_subgroups = {}  # subject handle -> subgroups whose practicals are counted for it
+        for subject in self.subjects:
+            if subject.group_index is not None:
+                group = self.groups[subject.group_index]
+                self.subject_subgroups[subject.index] = group.subgroups if subject.requires_subgroups else [None]
+        # Penalty terms of a schedule without lessons
+        self.empty_penalty_terms = {('subject', index): self.subject_penalty(index, {}, {})
+                                    for index in self.subject_subgroups}
+        self._codec = None
+        self.fitness_cache = None  # cache.FitnessCache used by evaluate_population, see use_fitness_cache
+
+    def __getstate__(self):
+        # The genome codec is rebuilt on demand and every process keeps its own fitness cache,
+        # e.g. after the problem was shipped to a worker process
+        state = self.__dict__.copy()
+        state['_codec'] = None
+        state['fitness_cache'] = None
+        return state
+
+    def use_fitness_cache(self, max_bytes):
+        # A new, empty cache of fitness values of schedules of this problem in at most max_bytes, 0 disables it
+        self.fitness_cache = FitnessCache(max_bytes) if max_bytes else None
+        return self.fitness_cache
+
+    def subject_penalty(self, subject_index, lecture_counts, practical_counts):
+        subject = self.subjects[subject_index]
+        subgroups = self.subject_subgroups[subject_index]
+        penalty = abs(lecture_counts.get(subject_index, 0) * len(subgroups) - subject.num_lectures) * 2
+        for subgroup in subgroups:
+            penalty += abs(practical_counts.get((subject_index, subgroup), 0) - subject.num_practicals) * 2
+        return penalty
+
+    def students(self, group_index, subgroup):
+        # Number of students attending a lesson of the group or one of its subgroups
+        group = self.groups[group_index]
+        if subgroup and group.subgroups:
+            return group.size // len(group.subgroups)
+        return group.size
+
+    def codec(self):
+        # GenomeCodec for batched fitness evaluation, None if NumPy is not installed
+        if self._codec is None and genome is not None:
+            self._codec = genome.GenomeCodec(self.registry, DAYS, PERIODS)
+        return self._codec
+
+def input_paths(paths='.'):
+    # A directory with the four CSV files, or a mapping from INPUT_FILES keys to file paths
+    if isinstance(paths, (str, os.PathLike)):
+        return {name: os.path.join(paths, filename) for name, filename in INPUT_FILES.items()}
+    missing = set(INPUT_FILES) - set(paths)
+    if missing:
+        raise ValueError(f"Missing input files: {', '.join(sorted(missing))}")
+    return dict(paths)
+
+def load_problem(paths='.', cache_path=None):
+    # With cache_path the parsed input files are kept in a binary cache (see problem_cache.py)
+    paths = input_paths(paths)
+    if cache_path is None:
+        return Problem(load_registry(paths))
+    from . import problem_cache
+    return Problem(problem_cache.load_registry(paths, cache_path))
@@ -0,0 +1,192 @@
+# Compiled cache of the parsed input files.
+#
+# The first load parses and validates the CSV files as usual and stores the validated entities
+# in a compact little-endian binary file. The file is keyed by a hash of the contents of the four
+# CSV files. Later loads with the same inputs memory-map that file instead of parsing:
+#
+#   header     magic, format version, input key, CRC-32 of everything after the header
+#   strings    count, character offsets and the UTF-8 text of every distinct string
+#   tables     for each input file: row count, source lines, then one int32 column per entity
+#              attribute (string attributes as string numbers, string lists as offsets + numbers)
+#
+# The cache holds the rows as read, duplicates included, so interning and the cross-reference
+# checks of data.Registry run as before and report the same warnings; they are linear and cheap
+# next to CSV parsing. Inputs with invalid rows are never cached. A cache that fails the checksum
+# or cannot be decoded is treated like an outdated one and rebuilt.
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from .data import Auditorium, Group, Lecturer, LoadReport, Registry, Subject, read_entities
+
+MAGIC = b'GAPC'
+VERSION = 2
+HEADER = struct.Struct('<4sH16sI')
+DECODE_ERRORS = (ValueError, IndexError, OverflowError, struct.error)  # A damaged cache, see load_registry
+KINDS = ('auditoriums', 'groups', 'lecturers', 'subjects')
+
+# Input file -> entity class and its (attribute, type) pairs
+FIELDS = {
+    'auditoriums': (Auditorium, [('id', 'str'), ('capacity', 'int')]),
+    'groups': (Group, [('number', 'str'), ('size', 'int'), ('subgroups', 'strs')]),
+    'lecturers': (Lecturer, [('id', 'str'), ('name', 'str'), ('subjects_can_teach', 'strs'),
+                             ('types_can_teach', 'strs'), ('max_hours_per_week', 'int')]),
+    'subjects': (Subject, [('id', 'str'), ('name', 'str'), ('group_id', 'str'), ('num_lectures', 'int'),
+                           ('num_practicals', 'int'), ('requires_subgroups', 'bool'), ('week_type', 'str')]),
+}
+
+def input_key(paths):
+    digest = hashlib.blake2b(digest_size=16)
+    for kind in KINDS:
+        with open(paths[kind], 'rb') as file:
+            data = file.read()
+        digest.update(struct.pack('<Q', len(data)))
+        digest.update(data)
+    return digest.digest()
+
+def int32_bytes(values):
+    data = array('i', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+class Reader:
+    # Sequential reads of int32 arrays from a buffer
+    def __init__(self, buffer, offset):
+        self.buffer = buffer
+        self.offset = offset
+
+    def ints(self, length):
+        end = self.offset + 4 * length
+        if end > len(self.buffer):
+            raise ValueError("Truncated problem cache")
+        data = array('i')
+        data.frombytes(self.buffer[self.offset:end])
+        if sys.byteorder == 'big':
+            data.byteswap()
+        self.offset = end
+        return data.tolist()
+
+    def int(self):
+        return self.ints(1)[0]
+
+    def text(self, length):
+        end = self.offset + length
+        if end > len(self.buffer):
+            raise ValueError("Truncated problem cache")
+        data = bytes(self.buffer[self.offset:end]).decode('utf-8')
+        self.offset = end
+        return data
+
+def encode(key, entities):
+    # entities: input file -> entities in file order, as read by data.read_entities
+    strings = {}
+
+    def number(value):
+        return strings.setdefault(value, len(strings))
+
+    tables = []
+    for kind in KINDS:
+        _, fields = FIELDS[kind]
+        rows = entities[kind]
+        tables.append(int32_bytes([len(rows)]))
+        tables.append(int32_bytes([entity.source[1] for entity in rows]))
+        for attribute, kind_of_field in fields:
+            values = [getattr(entity, attribute) for entity in rows]
+            if kind_of_field == 'str':
+                tables.append(int32_bytes([number(value) for value in values]))
+            elif kind_of_field == 'strs':
+                offsets = [0]
+                for value in values:
+                    offsets.append(offsets[-1] + len(value))
+                tables.append(int32_bytes(offsets))
+                tables.append(int32_bytes([number(item) for value in values for item in value]))
+            else:
+                tables.append(int32_bytes([int(value) for value in values]))
+    offsets = [0]
+    for value in strings:
+        offsets.append(offsets[-1] + len(value))
+    text = ''.join(strings).encode('utf-8')
+    payload = b''.join([int32_bytes([len(strings), len(text)]), int32_bytes(offsets), text] + tables)
+    return HEADER.pack(MAGIC, VERSION, key, zlib.crc32(payload)) + payload
+
+def decode(buffer, key, paths):
+    # Entities per input file, None if the cache is for other inputs or another format
+    try:
+        magic, version, cached_key, checksum = HEADER.unpack_from(buffer, 0)
+    except struct.error:
+        return None
+    if magic != MAGIC or version != VERSION or cached_key != key:
+        return None
+    if zlib.crc32(buffer[HEADER.size:]) != checksum:
+        raise ValueError("Damaged problem cache")
+    reader = Reader(buffer, HEADER.size)
+    count, length = reader.ints(2)
+    offsets = reader.ints(count + 1)
+    text = reader.text(length)
+    strings = [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+    entities = {}
+    for kind in KINDS:
+        entity_class, fields = FIELDS[kind]
+        rows = reader.int()
+        columns = [[(paths[kind], line) for line in reader.ints(rows)]]
+        for _, kind_of_field in fields:
+            if kind_of_field == 'strs':
+                bounds = reader.ints(rows + 1)
+                items = [strings[i] for i in reader.ints(bounds[-1])]
+                columns.append([items[bounds[i]:bounds[i + 1]] for i in range(rows)])
+                continue
+            values = reader.ints(rows)
+            if kind_of_field == 'str':
+                values = [strings[i] for i in values]
+            elif kind_of_field == 'bool':
+                values = [bool(value) for value in values]
+            columns.append(values)
+        # The constructors parse strings, so the entities get their attributes directly
+        names = ['source'] + [attribute for attribute, _ in fields]
+        objects = []
+        for values in zip(*columns):
+            entity = entity_class.__new__(entity_class)
+            entity.__dict__ = dict(zip(names, values))
+            objects.append(entity)
+        entities[kind] = objects
+    return entities
+
+def load(path, key, paths):
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return None
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        buffer = memoryview(mapped)
+        try:
+            return decode(buffer, key, paths)
+        finally:
+            buffer.release()
+
+def save(path, key, entities):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(encode(key, entities))
+    os.replace(temporary, path)
+
+def load_registry(paths, cache_path):
+    # Like data.load_registry, from cache_path when it was written for the same input files
+    key = input_key(paths)
+    report = LoadReport()
+    try:
+        entities = load(cache_path, key, paths)
+    except DECODE_ERRORS:
+        entities = None  # A damaged cache is rebuilt like an outdated one
+    if entities is not None:
+        for kind in KINDS:
+            report.rows[paths[kind]] = len(entities[kind])
+        return Registry(*(entities[kind] for kind in KINDS), report)
+    entities = {kind: list(read_entities(kind, paths[kind], report)) for kind in KINDS}
+    registry = Registry(*(entities[kind] for kind in KINDS), report)
+    if not report.counts['error']:
+        save(cache_path, key, entities)
+    return registry
@@ -0,0 +1,139 @@
+# Profiling mode (--profile MODE or the SCHEDULER_PROFILE environment variable).
+#
+#   counters  - call counts of the hot-path functions in HOT_PATH, a few percent of overhead
+#   timers    - call counts and cumulative (inclusive) time of the same functions
+#   full      - timers, with the whole run under cProfile and tracemalloc; several times slower
+#
+# The functions are wrapped by rebinding them in every loaded scheduler module that imported
+# them, and put back when the profile ends. Only the calling process is measured: with workers or
+# islands the offspring are produced elsewhere and the counts cover the main process only.
+#
+# The report lists calls, cumulative seconds and microseconds per call of each wrapped function,
+# then (full) the PROFILE_LINES functions with the most cumulative time according to cProfile,
+# the peak of traced memory and the MEMORY_LINES source lines holding the most memory at the end
+# of the run.
+
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+
+MODES = ('counters', 'timers', 'full')
+ENVIRONMENT_VARIABLE = 'SCHEDULER_PROFILE'
+PROFILE_LINES = 25
+MEMORY_LINES = 15
+
+# (module, function) and (module, class, method) of the genetic algorithm's hot path
+HOT_PATH = [
+    ('scheduler.operators', 'create_initial_population'),
+    ('scheduler.operators', 'assign_randomly'),
+    ('scheduler.operators', 'selection'),
+    ('scheduler.operators', 'crossover'),
+    ('scheduler.operators', 'mutate'),
+    ('scheduler.operators', 'evaluate_population'),
+    ('scheduler.schedule', 'is_conflict'),
+]
+HOT_METHODS = [
+    ('scheduler.schedule', 'Schedule', 'calculate_fitness'),
+    ('scheduler.schedule', 'Schedule', 'update_fitness'),
+]
+
+def counted(function, stats):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        stats[0] += 1
+        return function(*args, **kwargs)
+    return wrapper
+
+def timed(function, stats, clock=time.perf_counter):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats[0] += 1
+            stats[1] += clock() - started
+    return wrapper
+
+class Profile:
+    def __init__(self, mode='counters'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.stats = {}  # function name -> [calls, seconds]
+        self.restore = []  # (object, attribute, original value)
+        self.profiler = None
+        self.memory = None
+        self.peak_bytes = None
+        self.seconds = None
+
+    def _install(self):
+        # Import the hot-path modules so that later imports of them see the wrappers too
+        from . import operators, schedule  # noqa: F401
+        wrap = counted if self.mode == 'counters' else timed
+        for module_name, name in HOT_PATH:
+            original = getattr(sys.modules[module_name], name)
+            wrapper = wrap(original, self.stats.setdefault(name, [0, 0.0]))
+            for module in list(sys.modules.values()):
+                if module is not None and module.__name__.startswith('scheduler') and \
+                        getattr(module, name, None) is original:
+                    self.restore.append((module, name, original))
+                    setattr(module, name, wrapper)
+        for module_name, class_name, name in HOT_METHODS:
+            cls = getattr(sys.modules[module_name], class_name)
+            original = cls.__dict__[name]
+            self.restore.append((cls, name, original))
+            setattr(cls, name, wrap(original, self.stats.setdefault(f'{class_name}.{name}', [0, 0.0])))
+
+    def _uninstall(self):
+        for target, name, original in reversed(self.restore):
+            setattr(target, name, original)
+        self.restore = []
+
+    def __enter__(self):
+        self._install()
+        if self.mode == 'full':
+            tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+        if tracemalloc.is_tracing():
+            self.memory = tracemalloc.take_snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self._uninstall()
+        return False
+
+    def report(self):
+        lines = [f"Profile ({self.mode}) of a {self.seconds:.3f} s run", '']
+        if self.mode == 'counters':
+            lines.append(f"{'function':<28}{'calls':>12}")
+            for name, (calls, _) in sorted(self.stats.items(), key=lambda item: -item[1][0]):
+                lines.append(f"{name:<28}{calls:>12}")
+        else:
+            lines.append(f"{'function':<28}{'calls':>12}{'cumulative s':>14}{'us per call':>13}")
+            for name, (calls, seconds) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+                per_call = f'{seconds / calls * 1e6:.2f}' if calls else '-'
+                lines.append(f"{name:<28}{calls:>12}{seconds:>14.3f}{per_call:>13}")
+        if self.profiler is not None:
+            text = io.StringIO()
+            pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_LINES)
+            lines += ['', f"cProfile, top {PROFILE_LINES} by cumulative time", text.getvalue().strip()]
+        if self.memory is not None:
+            lines += ['', f"tracemalloc, peak {self.peak_bytes / 2**20:.1f} MiB traced; "
+                          f"top {MEMORY_LINES} lines by memory held at the end"]
+            for statistic in self.memory.statistics('lineno')[:MEMORY_LINES]:
+                frame = statistic.traceback[0]
+                lines.append(f"{statistic.size / 1024:10.1f} KiB {statistic.count:>9} blocks  "
+                             f"{frame.filename}:{frame.lineno}")
+        return '\n'.join(lines) + '\n'
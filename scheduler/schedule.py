@@ -0,0 +1,393 @@
+# Lessons, week timetables and schedules with their fitness
+from array import array
+
+# Defining time slots: 5 days, 4 periods per day
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+PERIODS = ['1', '2', '3', '4']  # Periods per day
+TIME_SLOTS = [(day, period) for day in DAYS for period in PERIODS]
+SLOT_POSITION = {(day, period): (DAYS.index(day), PERIODS.index(period)) for day, period in TIME_SLOTS}
+SLOT_INDEX = {time_slot: i for i, time_slot in enumerate(TIME_SLOTS)}
+WEEKS = ['even', 'odd']
+LESSON_TYPES = ['Лекція', 'Практика']
+LESSON_FIELDS = 7  # Integers per lesson in Schedule.pack()
+EMPTY_DAY = (0,) * len(PERIODS)
+SIGNATURE_MASK = (1 << 64) - 1
+
+def day_gaps(period_counts):
+    # Free periods between the first and the last lesson of a day
+    occupied = [i for i, count in enumerate(period_counts) if count]
+    if not occupied:
+        return 0
+    return occupied[-1] - occupied[0] + 1 - len(occupied)
+
+class Lesson:
+    # Refers to its subject, group, lecturer and auditorium by registry handles
+    def __init__(self, subject_index, lesson_type, group_index, subgroup=None):
+        self.subject_index = subject_index
+        self.type = lesson_type  # 'Lecture' or 'Practice'
+        self.group_index = group_index
+        self.subgroup = subgroup  # For practicals if subgroups are required
+        self.time_slot = None
+        self.auditorium_index = None
+        self.lecturer_index = None
+
+    def moved_to(self, time_slot):
+        # Placed lessons are shared between schedules, so a move creates a new lesson
+        lesson = Lesson(self.subject_index, self.type, self.group_index, self.subgroup)
+        lesson.time_slot = time_slot
+        lesson.auditorium_index = self.auditorium_index
+        lesson.lecturer_index = self.lecturer_index
+        return lesson
+
+def lesson_hash(week, time_slot, lesson):
+    # Hash of one assignment; a schedule's signature is the sum over its lessons, so it does not
+    # depend on the order in which lessons were added
+    return hash((week, time_slot, lesson.subject_index, lesson.type, lesson.group_index, lesson.subgroup,
+                 lesson.lecturer_index, lesson.auditorium_index))
+
+def occupancy_keys(lesson):
+    # What a lesson occupies in its time slot
+    keys = [('group', lesson.group_index)]
+    if lesson.subgroup:
+        keys.append(('subgroup', lesson.group_index, lesson.subgroup))
+    else:
+        keys.append(('whole', lesson.group_index))
+    if lesson.lecturer_index is not None:
+        keys.append(('lecturer', lesson.lecturer_index))
+    if lesson.auditorium_index is not None:
+        keys.append(('auditorium', lesson.auditorium_index))
+    return keys
+
+def is_consistent(occupied):
+    # True if no two lessons counted in the occupancy of one slot conflict with each other
+    for key, count in occupied.items():
+        if key[0] == 'group':
+            if count > 1 and ('whole', key[1]) in occupied:
+                return False
+        elif count > 1:
+            return False
+    return True
+
+class Timetable:
+    # Lessons of one week by time slot, plus per-slot occupancy counters for constant-time conflict checks.
+    # Slots are copy-on-write: clones share the lesson lists and counters until one side modifies a slot.
+    def __init__(self):
+        self.slots = {time_slot: [] for time_slot in TIME_SLOTS}
+        self.occupancy = {time_slot: {} for time_slot in TIME_SLOTS}
+        self.owned = set(TIME_SLOTS)  # Slots that are not shared with any other timetable
+
+    def clone(self):
+        timetable = Timetable.__new__(Timetable)
+        timetable.slots = dict(self.slots)
+        timetable.occupancy = dict(self.occupancy)
+        timetable.owned = set()
+        self.owned = set()
+        return timetable
+
+    def reset(self):
+        # Empty every slot, clearing the slots owned by this timetable in place
+        for time_slot in TIME_SLOTS:
+            if time_slot in self.owned:
+                self.slots[time_slot].clear()
+                self.occupancy[time_slot].clear()
+            else:
+                self.slots[time_slot] = []
+                self.occupancy[time_slot] = {}
+        self.owned.update(TIME_SLOTS)
+
+    def share_slot(self, time_slot, other):
+        # Take over a slot of another timetable without copying it
+        self.slots[time_slot] = other.slots[time_slot]
+        self.occupancy[time_slot] = other.occupancy[time_slot]
+        self.owned.discard(time_slot)
+        other.owned.discard(time_slot)
+
+    def _own(self, time_slot):
+        if time_slot not in self.owned:
+            self.slots[time_slot] = list(self.slots[time_slot])
+            self.occupancy[time_slot] = dict(self.occupancy[time_slot])
+            self.owned.add(time_slot)
+
+    def __getitem__(self, time_slot):
+        return self.slots[time_slot]
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def items(self):
+        return self.slots.items()
+
+    def values(self):
+        return self.slots.values()
+
+    def add(self, time_slot, lesson):
+        self._own(time_slot)
+        self.slots[time_slot].append(lesson)
+        occupied = self.occupancy[time_slot]
+        for key in occupancy_keys(lesson):
+            occupied[key] = occupied.get(key, 0) + 1
+
+    def remove(self, time_slot, lesson):
+        self._own(time_slot)
+        self.slots[time_slot].remove(lesson)
+        occupied = self.occupancy[time_slot]
+        for key in occupancy_keys(lesson):
+            if occupied[key] == 1:
+                del occupied[key]
+            else:
+                occupied[key] -= 1
+
+class Schedule:
+    def __init__(self, problem):
+        self.problem = problem
+        # Key: time_slot (day, period), Value: list of lessons at that time
+        self.even_timetable = Timetable()
+        self.odd_timetable = Timetable()
+        self.fitness = None  # To be calculated
+        # Cached penalty contributions, kept in sync by add_lesson/remove_lesson
+        self.penalty_terms = dict(problem.empty_penalty_terms)
+        self.penalty = sum(self.penalty_terms.values())
+        self.penalty_by_kind = {'gap': 0, 'overload': 0, 'subject': self.penalty}  # Totals of the terms by key[0]
+        self.signature = 0  # Canonical hash of the assignments, see lesson_hash
+        self.day_periods = {}  # (week, entity, day) -> tuple with the number of lessons in each period
+        self.lecturer_hours = {}  # (week, lecturer handle) -> number of lessons
+        self.lecture_counts = {}  # subject handle -> lectures in both weeks
+        self.practical_counts = {}  # (subject handle, subgroup) -> practicals in both weeks
+
+    def clone(self):
+        # Cheap copy: timetables are shared copy-on-write, lessons and entities are shared as is
+        schedule = Schedule.__new__(Schedule)
+        schedule.problem = self.problem
+        schedule.even_timetable = self.even_timetable.clone()
+        schedule.odd_timetable = self.odd_timetable.clone()
+        schedule.fitness = self.fitness
+        schedule.penalty_terms = dict(self.penalty_terms)
+        schedule.penalty = self.penalty
+        schedule.penalty_by_kind = dict(self.penalty_by_kind)
+        schedule.signature = self.signature
+        schedule.day_periods = dict(self.day_periods)
+        schedule.lecturer_hours = dict(self.lecturer_hours)
+        schedule.lecture_counts = dict(self.lecture_counts)
+        schedule.practical_counts = dict(self.practical_counts)
+        return schedule
+
+    def reset(self):
+        # Make this an empty schedule again, reusing its containers. Only for a schedule that is
+        # no longer used: lessons and slots shared with other schedules are left untouched.
+        self.even_timetable.reset()
+        self.odd_timetable.reset()
+        self.fitness = None
+        self.penalty_terms.clear()
+        self.penalty_terms.update(self.problem.empty_penalty_terms)
+        self.penalty = sum(self.penalty_terms.values())
+        self.penalty_by_kind.update(gap=0, overload=0, subject=self.penalty)
+        self.signature = 0
+        self.day_periods.clear()
+        self.lecturer_hours.clear()
+        self.lecture_counts.clear()
+        self.practical_counts.clear()
+
+    def pack(self):
+        # Compact picklable encoding with LESSON_FIELDS integers per lesson
+        groups = self.problem.groups
+        data = array('i')
+        for w, week in enumerate(WEEKS):
+            offset = w * len(TIME_SLOTS)
+            for time_slot, lessons in self.timetable(week).items():
+                slot = offset + SLOT_INDEX[time_slot]
+                for lesson in lessons:
+                    subgroups = groups[lesson.group_index].subgroups
+                    data.extend((
+                        slot,
+                        lesson.subject_index,
+                        LESSON_TYPES.index(lesson.type),
+                        lesson.group_index,
+                        subgroups.index(lesson.subgroup) + 1 if lesson.subgroup else 0,
+                        -1 if lesson.lecturer_index is None else lesson.lecturer_index,
+                        -1 if lesson.auditorium_index is None else lesson.auditorium_index
+                    ))
+        return data
+
+    @staticmethod
+    def unpack(problem, data, fitness=None):
+        groups = problem.groups
+        schedule = Schedule(problem)
+        for i in range(0, len(data), LESSON_FIELDS):
+            slot, subject_index, lesson_type, group_index, subgroup, lecturer_index, auditorium_index = \
+                data[i:i + LESSON_FIELDS]
+            week = WEEKS[slot // len(TIME_SLOTS)]
+            time_slot = TIME_SLOTS[slot % len(TIME_SLOTS)]
+            subgroup = groups[group_index].subgroups[subgroup - 1] if subgroup else None
+            lesson = Lesson(subject_index, LESSON_TYPES[lesson_type], group_index, subgroup)
+            lesson.time_slot = time_slot
+            lesson.lecturer_index = lecturer_index if lecturer_index >= 0 else None
+            lesson.auditorium_index = auditorium_index if auditorium_index >= 0 else None
+            schedule.add_lesson(week, time_slot, lesson)
+        schedule.fitness = fitness
+        return schedule
+
+    def timetable(self, week):
+        return self.even_timetable if week == 'even' else self.odd_timetable
+
+    def add_lesson(self, week, time_slot, lesson):
+        self.timetable(week).add(time_slot, lesson)
+        self._update_penalty(week, time_slot, lesson, 1)
+
+    def remove_lesson(self, week, time_slot, lesson):
+        self.timetable(week).remove(time_slot, lesson)
+        self._update_penalty(week, time_slot, lesson, -1)
+
+    def move_lesson(self, week, lesson, new_time_slot):
+        self.remove_lesson(week, lesson.time_slot, lesson)
+        self.add_lesson(week, new_time_slot, lesson.moved_to(new_time_slot))
+
+    def inherit_slot(self, week, time_slot, source):
+        # Copy a slot of a parent's timetable, sharing its lesson list when nothing has to be dropped
+        timetable = self.timetable(week)
+        if not timetable[time_slot] and is_consistent(source.occupancy[time_slot]):
+            timetable.share_slot(time_slot, source)
+            for lesson in source[time_slot]:
+                self._update_penalty(week, time_slot, lesson, 1)
+            return
+        for lesson in source[time_slot]:
+            if not is_conflict(lesson, time_slot, timetable):
+                self.add_lesson(week, time_slot, lesson)
+
+    def update_fitness(self):
+        # Fitness from the cached penalty terms, without rescanning the timetables
+        self.fitness = 1 / (1 + max(self.penalty, 0))
+
+    def _set_term(self, key, value):
+        change = value - self.penalty_terms.get(key, 0)
+        self.penalty += change
+        self.penalty_by_kind[key[0]] += change
+        self.penalty_terms[key] = value
+
+    def _update_penalty(self, week, time_slot, lesson, delta):
+        # Re-score only the day of the touched group/lecturer and the counters of the lesson's subject
+        problem = self.problem
+        self.signature = (self.signature + delta * lesson_hash(week, time_slot, lesson)) & SIGNATURE_MASK
+        day, period = SLOT_POSITION[time_slot]
+        entities = []
+        if (lesson.group_index, lesson.subgroup) in problem.gap_buckets:
+            entities.append(('group', lesson.group_index, lesson.subgroup))
+        if lesson.lecturer_index is not None:
+            lecturer_index = lesson.lecturer_index
+            entities.append(('lecturer', lecturer_index))
+            hours = self.lecturer_hours.get((week, lecturer_index), 0) + delta
+            self.lecturer_hours[(week, lecturer_index)] = hours
+            overload = max(0, hours - problem.lecturer_max_hours[lecturer_index]) * 2
+            self._set_term(('overload', week, lecturer_index), overload)
+        for entity in entities:
+            period_counts = list(self.day_periods.get((week, entity, day), EMPTY_DAY))
+            period_counts[period] += delta
+            self.day_periods[(week, entity, day)] = tuple(period_counts)
+            self._set_term(('gap', week, entity, day), day_gaps(period_counts))
+        subject_index = lesson.subject_index
+        if lesson.type == 'Лекція':
+            self.lecture_counts[subject_index] = self.lecture_counts.get(subject_index, 0) + delta
+        elif lesson.type == 'Практика':
+            practical_key = (subject_index, lesson.subgroup)
+            self.practical_counts[practical_key] = self.practical_counts.get(practical_key, 0) + delta
+        if subject_index in problem.subject_subgroups:
+            penalty = problem.subject_penalty(subject_index, self.lecture_counts, self.practical_counts)
+            self._set_term(('subject', subject_index), penalty)
+
+    def calculate_fitness(self):
+        penalty = 0
+        # Fitness for even week
+        penalty += self._calculate_fitness_for_week(self.even_timetable)
+        # Fitness for odd week
+        penalty += self._calculate_fitness_for_week(self.odd_timetable)
+        # Soft constraints for subjects
+        penalty += self._calculate_soft_constraints()
+        if penalty < 0:
+            penalty = 0
+        self.fitness = 1 / (1 + penalty)
+
+    def _calculate_fitness_for_week(self, timetable):
+        penalty = 0
+        # Minimize gaps in the schedule for groups (soft constraint)
+        for group in self.problem.groups:
+            subgroups = group.subgroups if group.subgroups else [None]
+            for subgroup in subgroups:
+                schedule_list = []
+                for time_slot, lessons in timetable.items():
+                    for lesson in lessons:
+                        if lesson.group_index == group.index and lesson.subgroup == subgroup:
+                            schedule_list.append(time_slot)
+                schedule_sorted = sorted(schedule_list, key=lambda x: (DAYS.index(x[0]), int(x[1])))
+                for i in range(len(schedule_sorted) - 1):
+                    day1, period1 = schedule_sorted[i]
+                    day2, period2 = schedule_sorted[i + 1]
+                    if day1 == day2:
+                        gaps = int(period2) - int(period1) - 1
+                        if gaps > 0:
+                            penalty += gaps
+        # Minimize gaps in the schedule for lecturers (soft constraint)
+        for lecturer in self.problem.lecturers:
+            schedule_list = []
+            for time_slot, lessons in timetable.items():
+                for lesson in lessons:
+                    if lesson.lecturer_index == lecturer.index:
+                        schedule_list.append(time_slot)
+            schedule_sorted = sorted(schedule_list, key=lambda x: (DAYS.index(x[0]), int(x[1])))
+            for i in range(len(schedule_sorted) - 1):
+                day1, period1 = schedule_sorted[i]
+                day2, period2 = schedule_sorted[i + 1]
+                if day1 == day2:
+                    gaps = int(period2) - int(period1) - 1
+                    if gaps > 0:
+                        penalty += gaps
+            # Balancing lecturer workload (soft constraint)
+            hours_assigned = len(schedule_list)
+            max_hours = lecturer.max_hours_per_week
+            if hours_assigned > max_hours:
+                penalty += (hours_assigned - max_hours) * 2  # Penalty for exceeding
+        return penalty
+
+    def _calculate_soft_constraints(self):
+        penalty = 0
+        # Adding penalties for not meeting or exceeding the required number of hours per subject (soft constraint)
+        for subject in self.problem.subjects:
+            if subject.group_index is None:
+                continue
+            group = self.problem.groups[subject.group_index]
+            subgroups = group.subgroups if subject.requires_subgroups else [None]
+            scheduled_lectures = 0
+            scheduled_practicals = {s: 0 for s in subgroups}
+            required_lectures = subject.num_lectures
+            required_practicals = subject.num_practicals
+            for subgroup in subgroups:
+                for timetable in [self.even_timetable, self.odd_timetable]:
+                    for time_slot, lessons in timetable.items():
+                        for lesson in lessons:
+                            if lesson.type == 'Лекція' and lesson.subject_index == subject.index \
+                                    and lesson.group_index == group.index:
+                                scheduled_lectures += 1
+                            elif lesson.type == 'Практика' and lesson.subject_index == subject.index \
+                                    and lesson.group_index == group.index and lesson.subgroup == subgroup:
+                                scheduled_practicals[subgroup] += 1
+
+            # Calculating the difference between scheduled and required hours
+            diff_lectures = scheduled_lectures - required_lectures
+            diff_practicals = [abs(practical - required_practicals) for _, practical in scheduled_practicals.items()]
+            penalty += abs(diff_lectures) * 2
+            penalty += sum(diff_practicals) * 2
+        return penalty
+
+def is_conflict(lesson, time_slot, timetable):
+    occupied = timetable.occupancy[time_slot]
+    # Check for lecturer conflict (hard constraint)
+    if lesson.lecturer_index is not None and ('lecturer', lesson.lecturer_index) in occupied:
+        return True
+    # Check for auditorium conflict (hard constraint)
+    if lesson.auditorium_index is not None and ('auditorium', lesson.auditorium_index) in occupied:
+        return True
+    # Check for group and subgroup conflict (hard constraint)
+    if lesson.subgroup:
+        # A subgroup conflicts with itself and with lessons for the whole group
+        return (('subgroup', lesson.group_index, lesson.subgroup) in occupied or
+                ('whole', lesson.group_index) in occupied)
+    # A lesson without subgroups conflicts with all subgroups
+    return ('group', lesson.group_index) in occupied
@@ -0,0 +1,89 @@
+# Selection operators: the mating pool of a generation, chosen by Config.selection.
+#
+#   truncation  - the best TRUNCATION_RATE of the population
+#   tournament  - one winner of a tournament between Config.tournament_size random schedules
+#                 (drawn with replacement) per member of the population, O(n * tournament_size)
+#   sus         - stochastic universal sampling: as many schedules as the population has, each
+#                 picked with probability proportional to its fitness, by equally spaced pointers
+#                 in one pass over the population
+#
+# Tournament and SUS keep weaker schedules in the pool now and then, which keeps more diversity
+# than truncation. The pool may contain a schedule several times. Elites are chosen separately
+# by fittest(), whatever the selection.
+#
+# Replacement operators pick the schedules that steady-state children take the place of
+# (Config.replacement, see operators.steady_state_generation), as distinct population indices:
+#
+#   worst       - the worst schedules
+#   tournament  - per child, the loser of a tournament between Config.tournament_size schedules
+#
+# The best schedule of the population is never replaced.
+
+import heapq
+import random
+from operator import attrgetter
+
+TRUNCATION_RATE = 0.2
+HEAP_RATIO = 8  # heapq.nlargest beats a full sort when fewer than 1/HEAP_RATIO of the schedules are taken
+
+fitness = attrgetter('fitness')
+
+def fittest(population, count):
+    # The count best schedules, best first; ties keep the population order in both branches
+    if count * HEAP_RATIO < len(population):
+        return heapq.nlargest(count, population, key=fitness)
+    return sorted(population, key=fitness, reverse=True)[:count]
+
+def truncation(population, config):
+    return fittest(population, int(TRUNCATION_RATE * len(population)))
+
+def tournament(population, config):
+    size = config.tournament_size
+    return [max(random.choices(population, k=size), key=fitness) for _ in population]
+
+def stochastic_universal_sampling(population, config):
+    total = sum(schedule.fitness for schedule in population)
+    if total == 0:
+        return list(population)
+    step = total / len(population)
+    pointer = random.uniform(0, step)
+    pool = []
+    cumulative = 0.0
+    for schedule in population:
+        cumulative += schedule.fitness
+        while pointer < cumulative and len(pool) < len(population):
+            pool.append(schedule)
+            pointer += step
+    # Rounding can leave the last pointer just past the total
+    pool.extend(population[-1:] * (len(population) - len(pool)))
+    return pool
+
+SELECTIONS = {
+    'truncation': truncation,
+    'tournament': tournament,
+    'sus': stochastic_universal_sampling,
+}
+
+def replaceable(population):
+    # Indices of all schedules but the best one
+    best = max(range(len(population)), key=lambda i: population[i].fitness)
+    return [i for i in range(len(population)) if i != best]
+
+def worst(population, count, config):
+    candidates = replaceable(population)
+    return heapq.nsmallest(count, candidates, key=lambda i: population[i].fitness)
+
+def tournament_loser(population, count, config):
+    candidates = replaceable(population)
+    losers = []
+    for _ in range(min(count, len(candidates))):
+        contestants = random.sample(candidates, min(config.tournament_size, len(candidates)))
+        loser = min(contestants, key=lambda i: population[i].fitness)
+        candidates.remove(loser)
+        losers.append(loser)
+    return losers
+
+REPLACEMENTS = {
+    'worst': worst,
+    'tournament': tournament_loser,
+}
@@ -0,0 +1,451 @@
+# Local HTTP scheduling service.
+#
+#   python -m scheduler.service --port 8080 --jobs 2
+#
+#   POST   /jobs                {"problem": {...}, "config": {...}} -> 202 {"id": ...}
+#   GET    /jobs                all jobs
+#   GET    /jobs/ID             status, generation and best fitness of a job
+#   GET    /jobs/ID/events      progress as server-sent events until the job ends
+#   GET    /jobs/ID/result      best schedule, ?format=json|jsonl|csv|ical|grid&view=group:ID&term_start=YYYY-MM-DD
+#   DELETE /jobs/ID             stops a job; a running one keeps the best schedule so far
+#
+# The problem maps every key of problem.INPUT_FILES to either the CSV text of that file or a list
+# of rows, i.e. objects with the CSV column names. It is validated on submission: invalid rows give
+# 400 with the load report. config takes the Config fields in CONFIG_FIELDS, checked against their
+# types and ranges before the job is queued.
+#
+# Every job runs ga.solve() in a process of its own and at most --jobs run at a time; the others
+# wait in submission order. Jobs therefore share no state at all, neither the random module nor
+# the per-process caches. The processes report progress and their result through one queue that
+# a thread hands over to the event loop. Only the standard library is used: the HTTP/1.1 subset
+# (one request per connection, Content-Length bodies) is implemented here.
+
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+from datetime import date
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from . import output
+from .cli import interrupt
+from .data import SCHEMAS
+from .ga import Config, solve
+from .local_search import NEIGHBOURHOODS
+from .problem import INPUT_FILES, load_problem
+from .schedule import Schedule
+from .selection import REPLACEMENTS, SELECTIONS, TRUNCATION_RATE
+
+MAX_BODY = 64 * 2**20
+# Config field -> (type, minimum or the allowed values); None is accepted where Config defaults to None
+CONFIG_FIELDS = {
+    'population_size': ('int', 2),
+    'generations': ('int', 0),
+    'seed': ('int', None),
+    'batch_fitness': ('bool', None),
+    'workers': ('int', 0),
+    'islands': ('int', 0),
+    'migration_interval': ('int', 1),
+    'migration_size': ('int', 0),
+    'topology': ('choice', ('ring', 'full')),
+    'time_limit': ('number', 0),
+    'max_evaluations': ('int', 0),
+    'stagnation_generations': ('int', 1),
+    'target_fitness': ('number', 0),
+    'initialization': ('choice', ('random', 'greedy')),
+    'selection': ('choice', tuple(SELECTIONS)),
+    'tournament_size': ('int', 1),
+    'memetic_individuals': ('int', 0),
+    'memetic_moves': ('int', 0),
+    'memetic_neighbourhoods': ('choices', tuple(NEIGHBOURHOODS)),
+    'fitness_cache_bytes': ('int', 0),
+    'steady_state': ('int', 0),
+    'replacement': ('choice', tuple(REPLACEMENTS)),
+}
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'ical': 'text/calendar',
+    'grid': 'text/plain',
+}
+FINISHED = ('done', 'failed', 'cancelled')
+
+class HTTPError(Exception):
+    def __init__(self, status, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+def run_job(job_id, problem, config, events):
+    # Target of a job process. SIGTERM stops the run like Ctrl+C: the best schedule so far is the result.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, interrupt)
+    try:
+        config.progress = lambda generation, best_fitness: events.put((job_id, 'progress', generation, best_fitness))
+        result = solve(problem, config)
+        events.put((job_id, 'done', result.schedule.pack(), result.fitness, result.generations, result.stop_reason,
+                    result.evaluations))
+    except KeyboardInterrupt:
+        events.put((job_id, 'cancelled', None))
+    except Exception as error:
+        events.put((job_id, 'failed', f'{type(error).__name__}: {error}'))
+
+def write_input(directory, problem):
+    # The problem of a request as the four CSV files in directory
+    if not isinstance(problem, dict) or set(problem) != set(INPUT_FILES):
+        raise HTTPError(400, f"problem needs exactly the keys {', '.join(INPUT_FILES)}")
+    for kind, filename in INPUT_FILES.items():
+        content = problem[kind]
+        with open(os.path.join(directory, filename), 'w', newline='', encoding='utf-8') as file:
+            if isinstance(content, str):
+                file.write(content)
+                continue
+            if not isinstance(content, list) or not all(isinstance(row, dict) for row in content):
+                raise HTTPError(400, f"problem.{kind} must be CSV text or a list of objects")
+            columns = [column for column, _ in SCHEMAS[kind][1]]
+            writer = csv.writer(file, delimiter=';')
+            writer.writerow(columns)
+            for row in content:
+                writer.writerow([';'.join(map(str, value)) if isinstance(value, list) else
+                                 '' if value is None else str(value) for value in (row.get(column) for column in columns)])
+
+def issue_record(issue):
+    return {'severity': issue.severity, 'file': os.path.basename(issue.file) if issue.file else None,
+            'line': issue.line, 'column': issue.column, 'message': issue.message}
+
+def parse_problem(data):
+    with tempfile.TemporaryDirectory(prefix='scheduler-') as directory:
+        write_input(directory, data)
+        problem = load_problem(directory)
+    if problem.report.counts['error']:
+        raise HTTPError(400, f"Invalid input data ({problem.report.summary()})",
+                        {'issues': [issue_record(issue) for issue in problem.report.issues]})
+    return problem
+
+def parse_config(data):
+    if not isinstance(data, dict):
+        raise HTTPError(400, "config must be an object")
+    unknown = sorted(set(data) - set(CONFIG_FIELDS))
+    if unknown:
+        raise HTTPError(400, f"Unknown config fields: {', '.join(unknown)}")
+    defaults = Config()
+    for field, value in data.items():
+        if value is None and getattr(defaults, field) is None:
+            continue
+        message = config_error(value, *CONFIG_FIELDS[field])
+        if message:
+            raise HTTPError(400, f"config.{field} {message}")
+    config = Config(**data)
+    if config.selection == 'truncation' and int(TRUNCATION_RATE * config.population_size) < 2:
+        raise HTTPError(400, "config.population_size is too small for truncation selection, which needs two parents")
+    if config.steady_state and config.workers and not config.islands:
+        raise HTTPError(400, "config.steady_state does not work with config.workers")
+    return config
+
+def config_error(value, kind, limit):
+    # Why value is not valid for a config field, None if it is
+    if kind == 'bool':
+        return None if isinstance(value, bool) else "must be true or false"
+    if kind == 'choice':
+        return None if value in limit else f"must be one of {', '.join(limit)}"
+    if kind == 'choices':
+        if isinstance(value, list) and value and all(item in limit for item in value):
+            return None
+        return f"must be a non-empty list of {', '.join(limit)}"
+    types = (int, float) if kind == 'number' else int
+    if not isinstance(value, types) or isinstance(value, bool):
+        return f"must be {'a number' if kind == 'number' else 'an integer'}"
+    if limit is not None and value < limit:
+        return f"must be at least {limit}"
+    return None
+
+class Job:
+    def __init__(self, job_id, problem, config):
+        self.id = job_id
+        self.problem = problem
+        self.config = config
+        self.status = 'queued'  # 'running', then 'done', 'failed' or 'cancelled'
+        self.generation = 0
+        self.best_fitness = None
+        self.result = None  # Best schedule of a finished job
+        self.stop_reason = None
+        self.evaluations = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.process = None
+        self.updated = asyncio.Event()  # Replaced after every change, see changed()
+
+    def changed(self):
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    def finish(self, status):
+        self.status = status
+        self.finished = time.time()
+        self.changed()
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'generation': self.generation,
+            'best_fitness': self.best_fitness,
+            'stop_reason': self.stop_reason,
+            'evaluations': self.evaluations,
+            'error': self.error,
+            'submitted': self.submitted,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+class Service:
+    def __init__(self, jobs=2):
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.slots = asyncio.Semaphore(jobs)
+        self.context = multiprocessing.get_context()
+        self.events = self.context.Queue()
+        self.server = None
+        self.reader = None
+
+    async def start(self, host='127.0.0.1', port=8080):
+        loop = asyncio.get_running_loop()
+        self.reader = threading.Thread(target=self.read_events, args=(loop,), daemon=True)
+        self.reader.start()
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for job in self.jobs.values():
+            if job.process is not None and job.process.is_alive():
+                job.process.terminate()
+        self.events.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self.reader.join)
+
+    def read_events(self, loop):
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            loop.call_soon_threadsafe(self.dispatch, event)
+
+    def dispatch(self, event):
+        job = self.jobs[event[0]]
+        kind = event[1]
+        if job.status in FINISHED:
+            return
+        if kind == 'progress':
+            job.generation, job.best_fitness = event[2], event[3]
+            job.changed()
+        elif kind == 'done':
+            data, fitness, job.generation, job.stop_reason, job.evaluations = event[2:]
+            job.result = Schedule.unpack(job.problem, data, fitness)
+            job.best_fitness = fitness
+            job.finish('done')
+        elif kind == 'exited':
+            # Put by run() after the process ended, so anything the process sent came first
+            job.error = f"The job process exited with code {event[2]}"
+            job.finish('failed')
+        else:
+            job.error = event[2]
+            job.finish(kind)
+
+    async def run(self, job):
+        async with self.slots:
+            if job.status != 'queued':
+                return  # Cancelled while waiting
+            job.status = 'running'
+            job.started = time.time()
+            job.changed()
+            job.process = self.context.Process(target=run_job, args=(job.id, job.problem, job.config, self.events))
+            job.process.start()
+            await asyncio.get_running_loop().run_in_executor(None, job.process.join)
+            self.events.put((job.id, 'exited', job.process.exitcode))
+
+    def job(self, job_id):
+        try:
+            return self.jobs[int(job_id)]
+        except (KeyError, ValueError):
+            raise HTTPError(404, f"No job {job_id}") from None
+
+    async def submit(self, body):
+        try:
+            request = json.loads(body)
+        except ValueError as error:
+            raise HTTPError(400, f"Invalid JSON: {error}") from None
+        if not isinstance(request, dict) or 'problem' not in request:
+            raise HTTPError(400, "The request needs a problem")
+        config = parse_config(request.get('config', {}))
+        problem = await asyncio.get_running_loop().run_in_executor(None, parse_problem, request['problem'])
+        job = Job(next(self.ids), problem, config)
+        self.jobs[job.id] = job
+        asyncio.get_running_loop().create_task(self.run(job))
+        return job
+
+    def cancel(self, job):
+        if job.status == 'queued':
+            job.finish('cancelled')
+        elif job.status == 'running' and job.process is not None:
+            job.process.terminate()
+
+    def export(self, job, query):
+        # The result of a finished job as (content type, text)
+        if job.result is None:
+            raise HTTPError(409, f"Job {job.id} has no result, it is {job.status}")
+        form = query.get('format', 'json')
+        if form not in CONTENT_TYPES:
+            raise HTTPError(400, f"Unknown format {form}")
+        view = name = None
+        if 'view' in query:
+            view, _, name = query['view'].partition(':')
+            table = getattr(job.problem, output.VIEWS[view][0]) if view in output.VIEWS else None
+            if table is None or table.handle(name) is None:
+                raise HTTPError(400, f"Unknown view {query['view']}")
+        file = io.StringIO()
+        if form == 'json':
+            output.write_json(job.result, file)
+        elif form == 'jsonl':
+            output.write_jsonl(job.result, file, view, name)
+        elif form == 'csv':
+            output.write_csv(job.result, file, view, name)
+        elif form == 'grid':
+            output.print_schedule(job.result, view, name, file)
+        else:
+            try:
+                term_weeks = int(query.get('term_weeks', 16))
+            except ValueError:
+                term_weeks = 0
+            if term_weeks < 1:
+                raise HTTPError(400, f"term_weeks must be a whole number of at least 1, got {query['term_weeks']}")
+            try:
+                term_start = date.fromisoformat(query['term_start'])
+                output.write_ical(job.result, file, term_start, term_weeks, view, name)
+            except (KeyError, ValueError) as error:
+                raise HTTPError(400, f"format=ical needs term_start=YYYY-MM-DD of a Monday: {error}") from None
+        return CONTENT_TYPES[form], file.getvalue()
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, target, body = await read_request(reader)
+                await self.route(method, target, body, writer)
+            except HTTPError as error:
+                document = {'error': str(error)}
+                document.update(error.details or {})
+                await respond(writer, error.status, document)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # The client went away
+        finally:
+            writer.close()
+
+    async def route(self, method, target, body, writer):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if parts == ['jobs'] and method == 'POST':
+            job = await self.submit(body)
+            await respond(writer, 202, dict(job.summary(), warnings=job.problem.warnings))
+        elif parts == ['jobs'] and method == 'GET':
+            await respond(writer, 200, [job.summary() for job in self.jobs.values()])
+        elif len(parts) == 2 and parts[0] == 'jobs' and method == 'GET':
+            await respond(writer, 200, self.job(parts[1]).summary())
+        elif len(parts) == 2 and parts[0] == 'jobs' and method == 'DELETE':
+            job = self.job(parts[1])
+            self.cancel(job)
+            await respond(writer, 202, job.summary())
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events' and method == 'GET':
+            await self.stream_events(self.job(parts[1]), writer)
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'result' and method == 'GET':
+            job = self.job(parts[1])
+            content_type, text = await asyncio.get_running_loop().run_in_executor(None, self.export, job, query)
+            await respond(writer, 200, text, content_type)
+        else:
+            raise HTTPError(404, f"No route for {method} {url.path}")
+
+    async def stream_events(self, job, writer):
+        # The current state first, then every change; fast progress may be merged into fewer events
+        writer.write(response_head(200, 'text/event-stream', extra='Cache-Control: no-cache\r\n'))
+        while True:
+            updated = job.updated
+            summary = job.summary()
+            event = job.status if job.status in FINISHED else 'progress'
+            writer.write(f"event: {event}\ndata: {json.dumps(summary, ensure_ascii=False)}\n\n".encode('utf-8'))
+            await writer.drain()
+            if job.status in FINISHED:
+                return
+            await updated.wait()
+
+def response_head(status, content_type, length=None, extra=''):
+    head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: {content_type}; charset=utf-8\r\n"
+    if length is not None:
+        head += f"Content-Length: {length}\r\n"
+    return (head + extra + "Connection: close\r\n\r\n").encode('latin-1')
+
+async def respond(writer, status, document, content_type='application/json'):
+    # document is text, sent as it is, or an object serialized as JSON
+    if not isinstance(document, str):
+        document = json.dumps(document, ensure_ascii=False)
+    body = document.encode('utf-8')
+    writer.write(response_head(status, content_type, len(body)) + body)
+    await writer.drain()
+
+async def read_request(reader):
+    line = await reader.readline()
+    try:
+        method, target, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(413, f"The body is larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method, target, body
+
+async def serve(host, port, jobs):
+    service = Service(jobs)
+    port = await service.start(host, port)
+    print(f"Scheduling service on http://{host}:{port} with {jobs} job slots", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='scheduler.service', description="Local HTTP service that runs scheduling jobs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--jobs', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Jobs running at the same time, each in its own process")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.jobs))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
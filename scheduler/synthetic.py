@@ -0,0 +1,87 @@
+# Reproducible synthetic faculties in the CSV schema of the input files.
+#
+#   python -m scheduler.synthetic --groups 100 --seed 1 --output-dir data/
+#
+# Every group gets SUBJECTS_PER_GROUP subjects of its own. Lecturers and auditoriums grow in
+# proportion to the number of groups, with enough teaching hours and rooms that a feasible
+# timetable usually exists.
+
+import argparse
+import csv
+import os
+import random
+
+from .problem import INPUT_FILES
+
+SUBJECTS_PER_GROUP = 2
+LECTURERS_PER_GROUP = 1.5
+AUDITORIUMS_PER_GROUP = 0.5
+CAPACITIES = [30, 60, 90]
+SUBJECT_NAMES = ['Алгебра', 'Аналіз', 'Бази даних', 'Мережі', 'Операційні системи', 'Статистика',
+                 'Програмування', 'Теорія ймовірностей', 'Дискретна математика', 'Чисельні методи']
+SURNAMES = ['Іваненко', 'Петренко', 'Сидоренко', 'Ткаченко', 'Коваленко', 'Бондаренко', 'Шевченко',
+            'Кравченко', 'Олійник', 'Мельник']
+
+def generate_instance(num_groups, seed=0):
+    # Rows of the four input files as dicts keyed by INPUT_FILES names
+    rng = random.Random(f'synthetic:{num_groups}:{seed}')
+    groups = []
+    for i in range(num_groups):
+        size = rng.randint(15, 60)
+        subgroups = '1;2' if size >= 20 else ''
+        groups.append({'groupNumber': f'G-{i + 1}', 'studentAmount': size, 'subgroups': subgroups})
+    subjects = []
+    for group in groups:
+        for _ in range(SUBJECTS_PER_GROUP):
+            subjects.append({
+                'id': f'S{len(subjects) + 1}',
+                'name': rng.choice(SUBJECT_NAMES),
+                'groupID': group['groupNumber'],
+                'numLectures': rng.randint(1, 3),
+                'numPracticals': rng.randint(1, 3),
+                'requiresSubgroups': 'yes' if group['subgroups'] and rng.random() < 0.5 else 'no',
+                'weekType': 'both',
+            })
+    num_lecturers = max(2, round(LECTURERS_PER_GROUP * num_groups))
+    teaching = {i: set() for i in range(num_lecturers)}
+    types = {i: set() for i in range(num_lecturers)}
+    for subject in subjects:
+        # One lecturer for the lectures and one for the practicals of every subject
+        for lesson_type in ('Лекція', 'Практика'):
+            lecturer = rng.randrange(num_lecturers)
+            teaching[lecturer].add(subject['id'])
+            types[lecturer].add(lesson_type)
+    lecturers = []
+    for i in range(num_lecturers):
+        lecturers.append({
+            'lecturerID': f'L{i + 1}',
+            'lecturerName': f'{rng.choice(SURNAMES)} {chr(0x0410 + rng.randrange(32))}.{chr(0x0410 + rng.randrange(32))}.',
+            'subjectsCanTeach': ','.join(sorted(teaching[i], key=lambda x: int(x[1:]))),
+            'typesCanTeach': ';'.join(sorted(types[i])),
+            'maxHoursPerWeek': rng.choice([15, 18, 20]),
+        })
+    auditoriums = [{'auditoriumID': f'A{i + 1}', 'capacity': rng.choice(CAPACITIES)}
+                   for i in range(max(4, round(AUDITORIUMS_PER_GROUP * num_groups)))]
+    return {'auditoriums': auditoriums, 'groups': groups, 'lecturers': lecturers, 'subjects': subjects}
+
+def write_instance(instance, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name, filename in INPUT_FILES.items():
+        rows = instance[name]
+        with open(os.path.join(directory, filename), 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]), delimiter=';')
+            writer.writeheader()
+            writer.writerows(rows)
+    return directory
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='scheduler.synthetic', description="Write a synthetic faculty as input CSV files")
+    parser.add_argument('--groups', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-dir', required=True)
+    args = parser.parse_args(argv)
+    write_instance(generate_instance(args.groups, args.seed), args.output_dir)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+# Per-generation telemetry as JSON Lines (Config.telemetry_path, --telemetry).
+#
+# One record per generation, generation 0 being the initial population:
+#
+#   generation, island          island is null outside the island model
+#   elapsed_seconds             since the start of the run
+#   evaluations                 fitness evaluations so far
+#   evaluations_per_second      of this generation
+#   best/mean/worst_fitness     of the population
+#   best_penalty                penalty of the best schedule by kind ('gap', 'overload', 'subject')
+#   diversity                   distinct schedules / population size
+#   phase_seconds               time per phase of this generation: selection, crossover, mutation,
+#                               evaluation, local_search and (islands) migration; with workers
+#                               crossover, mutation and evaluation are one 'offspring' phase
+#   rss_bytes                   resident memory of this process
+#
+# A flat best fitness with a high evaluation rate is a run burning CPU without progress; falling
+# diversity says the population has converged.
+
+import json
+import os
+import time
+
+from .schedule import Schedule
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def rss_bytes():
+    # Current resident set size where /proc is available, otherwise the peak
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+class Telemetry:
+    def __init__(self, path, append=False, island=None):
+        # Islands append to one file shared with the other islands, each record is one write
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self.island = island
+
+    @classmethod
+    def open(cls, config, island=None):
+        # None when the run has no telemetry
+        if not config.telemetry_path:
+            return None
+        return cls(config.telemetry_path, append=config.resume or island is not None, island=island)
+
+    def write(self, generation, budget, fitnesses, best_penalty, distinct, timings):
+        now = time.monotonic()
+        evaluations = budget.offspring if generation else len(fitnesses)
+        record = {
+            'generation': generation,
+            'island': self.island,
+            'elapsed_seconds': now - budget.started,
+            'evaluations': budget.evaluations,
+            'evaluations_per_second': evaluations / budget.generation_seconds if budget.generation_seconds else None,
+            'best_fitness': max(fitnesses),
+            'mean_fitness': sum(fitnesses) / len(fitnesses),
+            'worst_fitness': min(fitnesses),
+            'best_penalty': best_penalty,
+            'diversity': distinct / len(fitnesses),
+            'phase_seconds': timings,
+            'rss_bytes': rss_bytes(),
+        }
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def write_population(self, generation, budget, population, timings):
+        # population of Schedule objects
+        best = max(population, key=lambda x: x.fitness)
+        self.write(generation, budget, [schedule.fitness for schedule in population], dict(best.penalty_by_kind),
+                   len(set(schedule.signature for schedule in population)), timings)
+
+    def write_packed(self, generation, budget, population, problem, timings):
+        # population of parallel.PackedSchedule; only the best one is unpacked, for its penalty breakdown
+        best = max(population, key=lambda x: x.fitness)
+        self.write(generation, budget, [schedule.fitness for schedule in population],
+                   dict(Schedule.unpack(problem, best.data).penalty_by_kind),
+                   len(set(schedule.data.tobytes() for schedule in population)), timings)
+
+    def close(self):
+        self.file.close()
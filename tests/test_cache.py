@@ -0,0 +1,26 @@
+# A full fitness cache stays within the memory it is given
+import random
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+from scheduler.cache import FitnessCache
+
+@pytest.mark.parametrize('max_bytes', [2**18, 2**20, 2**22])
+def test_full_cache_stays_within_max_bytes(max_bytes):
+    cache = FitnessCache(max_bytes)
+    rng = random.Random(0)
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for _ in range(2 * cache.max_entries):
+            gap, overload, subject = rng.randrange(1000), rng.randrange(1000), rng.randrange(2000)
+            cache.put(SimpleNamespace(signature=rng.getrandbits(64), fitness=1 / (1 + gap + overload + subject),
+                                      penalty_by_kind={'gap': gap, 'overload': overload, 'subject': subject}))
+        growth = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert len(cache.entries) == cache.max_entries
+    assert cache.evictions == cache.max_entries
+    assert growth <= max_bytes
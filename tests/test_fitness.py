@@ -0,0 +1,60 @@
+# The incremental penalty terms of Schedule and the batched NumPy evaluation of genome.py agree
+# with the reference Schedule.calculate_fitness after the operators have edited the schedules
+import os
+import random
+
+import pytest
+
+from scheduler.ga import Config
+from scheduler.operators import (add_random_lesson, create_initial_population, crossover, mutate,
+                                 remove_random_lesson, transfer_lesson_between_weeks)
+from scheduler.problem import load_problem
+from scheduler.schedule import WEEKS
+from scheduler.synthetic import generate_instance, write_instance
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUNDS = 15
+
+@pytest.fixture(scope='module', params=['sample', 10, 30])
+def problem(request, tmp_path_factory):
+    if request.param == 'sample':
+        return load_problem(ROOT)
+    directory = tmp_path_factory.mktemp(f'groups{request.param}')
+    write_instance(generate_instance(request.param, seed=0), str(directory))
+    return load_problem(str(directory))
+
+def assert_fitness_agrees(population):
+    codec = population[0].problem.codec()
+    batch = codec.fitness(codec.encode(population)) if codec is not None else [None] * len(population)
+    for schedule, batch_fitness in zip(population, batch):
+        schedule.update_fitness()
+        reference = schedule.clone()
+        reference.calculate_fitness()
+        assert schedule.fitness == pytest.approx(reference.fitness)
+        if batch_fitness is not None:
+            assert float(batch_fitness) == pytest.approx(reference.fitness)
+
+def edit(schedule):
+    # Adds, removes and moves lessons within and between the weeks
+    week = random.choice(WEEKS)
+    add_random_lesson(schedule, week)
+    remove_random_lesson(schedule, random.choice(WEEKS))
+    transfer_lesson_between_weeks(schedule, week, WEEKS[1 - WEEKS.index(week)])
+    mutate(schedule, evaluate=False)
+
+@pytest.mark.parametrize('seed', range(2))
+def test_incremental_and_batch_fitness_match_reference(problem, seed):
+    random.seed(seed)
+    population = create_initial_population(problem, Config(population_size=8))
+    assert_fitness_agrees(population)
+    for _ in range(ROUNDS):
+        parent1, parent2, replaced = random.sample(population, 3)
+        children = [crossover(parent1, parent2, evaluate=False),
+                    crossover(parent1, parent2, evaluate=False, child=replaced)]
+        # Clones share the timetables copy-on-write with the schedule they were taken from
+        clones = [schedule.clone() for schedule in random.sample(population, 2)]
+        population = [schedule for schedule in population if schedule is not replaced] + children + clones
+        for schedule in population:
+            edit(schedule)
+        population = random.sample(population, 8)
+        assert_fitness_agrees(population)
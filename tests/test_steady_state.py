@@ -0,0 +1,33 @@
+# The best schedule kept by the genetic algorithm stays intact although replaced schedules lend
+# their storage to new children in the steady-state mode
+import random
+
+import pytest
+
+from scheduler.ga import Config, kept_best
+from scheduler.operators import create_initial_population, steady_state_generation
+from scheduler.problem import load_problem
+from scheduler.synthetic import generate_instance, write_instance
+
+@pytest.fixture(scope='module')
+def problem(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('instance')
+    write_instance(generate_instance(10, seed=0), str(directory))
+    return load_problem(str(directory))
+
+@pytest.mark.parametrize('seed', range(3))
+def test_kept_best_survives_replacement(problem, seed):
+    random.seed(seed)
+    config = Config(population_size=10, steady_state=1, replacement='worst')
+    population = create_initial_population(problem, config)
+    # A best schedule of an earlier generation that the population has since overtaken: the worst
+    # one now, so the first child takes its place
+    target = min(population, key=lambda schedule: schedule.fitness)
+    best = kept_best(config, target)
+    fitness, data = best.fitness, best.pack()
+    steady_state_generation(population, config)
+    assert any(schedule is target for schedule in population), "the replaced schedule's storage was not reused"
+    assert best.fitness == fitness
+    assert best.pack() == data
+    best.calculate_fitness()
+    assert best.fitness == pytest.approx(fitness)